@@ -119,6 +119,11 @@ st.markdown("""
 # HELPER FUNCTIONS
 # =============================================================================
 
+@st.cache_resource(ttl=60)
+def check_database_connection():
+    """Probe the database at most once a minute instead of on every rerun."""
+    return db.test_database_connection()
+
 @st.cache_data(ttl=60)
 def load_dashboard_data(filters):
     """Load all data needed for the dashboard with caching."""
@@ -822,7 +827,7 @@ def main():
     """, unsafe_allow_html=True)
     
     # Compact connection status indicator with gradient background
-    if not db.test_database_connection():
+    if not check_database_connection():
         st.markdown("""
         <div style="
             background: linear-gradient(135deg, #ff6b6b 0%, #ee5a52 100%);
@@ -1776,7 +1781,17 @@ def main():
         
     else:
         st.warning("No league table data found for the selected filters. Please adjust your selection.")
-    
+
+    # Cache statistics (rendered last so this run's hits/misses are included)
+    cache_stats = db.get_cache_stats()
+    st.session_state['_cache_stats'] = cache_stats
+    with st.sidebar.expander("🧮 Cache Statistics"):
+        if not cache_stats.empty:
+            st.dataframe(cache_stats, hide_index=True, use_container_width=True)
+            st.caption(f"Estimated time saved: {cache_stats['time_saved_s'].sum():.2f}s")
+        else:
+            st.caption("No cached calls yet.")
+
     # Footer
     st.divider()
     st.markdown("""
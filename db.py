@@ -5,27 +5,83 @@ Handles PostgreSQL connections, caching, and all data retrieval functions.
 """
 
 import os
+import sys
 import json
+import time
+import functools
 import pandas as pd
 import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
+import psycopg2.pool
 from psycopg2.extras import RealDictCursor
 import streamlit as st
 from typing import Optional, Dict, Any, List, Tuple
 import logging
-from dotenv import load_dotenv
+import re
+import threading
+from pathlib import Path
+from urllib.parse import quote
 
-# Load environment variables from .env file
-load_dotenv()
+# Optional: Arrow-native result fetching; falls back to psycopg2 when missing
+try:
+    import connectorx as cx
+    import pyarrow as pa
+except ImportError:
+    cx = None
+
+def _load_env_file() -> None:
+    """
+    Export KEY=VALUE lines from the nearest .env file (searching upward from this module).
+    Variables already set in the environment win, matching load_dotenv's default.
+    """
+    here = Path(__file__).resolve().parent
+    env_path = next((d / '.env' for d in (here, *here.parents) if (d / '.env').is_file()), None)
+    if env_path is None:
+        return
+    
+    for line in env_path.read_text(encoding='utf-8').splitlines():
+        line = line.strip()
+        if not line or line.startswith('#') or '=' not in line:
+            continue
+        key, _, value = line.partition('=')
+        key = key.strip()
+        if key.startswith('export '):
+            key = key[len('export '):].strip()
+        value = value.strip()
+        if value[:1] in ('"', "'") and value[0] in value[1:]:
+            # Quoted: keep everything up to the closing quote, '#' included
+            value = value[1:value.index(value[0], 1)]
+        else:
+            # Unquoted: a ' #' starts an inline comment, as in python-dotenv
+            value = re.split(r'\s+#', value, maxsplit=1)[0]
+        os.environ.setdefault(key, value)
+
+# Load environment variables from .env file, once per process tree: the flag is
+# inherited by child processes, which then read the already-exported values
+if not os.environ.get('_DOTENV_LOADED'):
+    _load_env_file()
+    os.environ['_DOTENV_LOADED'] = '1'
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class PreparedStatementConnection(psycopg2.extensions.connection):
+    """Connection that remembers which statements were PREPAREd in its session."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
 class DatabaseManager:
     """
     Handles PostgreSQL database connections and query execution with caching.
     """
     
+    # Upper bound on pooled sessions shared by all Streamlit sessions in this process
+    POOL_MAX_CONNECTIONS = 4
+    
     def __init__(self, config_path: str = "../config.json"):
         """
         Initialize database manager with credentials from .env file or config.json.
@@ -35,6 +91,12 @@ class DatabaseManager:
         """
         self.config_path = config_path
         self.connection_params = self._load_db_config()
+        # Long-lived sessions for prepared statements, created on first use
+        self._pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        # psycopg2 raises PoolError instead of waiting when the pool is empty, so
+        # borrowers queue on this semaphore for a free slot first
+        self._pool_slots = threading.BoundedSemaphore(self.POOL_MAX_CONNECTIONS)
 
     def _load_streamlit_secrets(self) -> Dict[str, Any]:
         """Attempt to load database credentials from Streamlit secrets."""
@@ -139,6 +201,7 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"Database connection failed: {e}")
             st.error(f"Failed to connect to database: {e}")
+            _mark_query_failed()
             return None
     
     def execute_query(self, query: str, params: Optional[tuple] = None) -> pd.DataFrame:
@@ -186,7 +249,220 @@ class DatabaseManager:
             import traceback
             logger.error(f"Full traceback: {traceback.format_exc()}")
             st.error(f"Query failed: {e}")
+            _mark_query_failed()
+            return pd.DataFrame()
+        finally:
+            conn.close()
+
+    def execute_list(self, query: str, params: Optional[tuple] = None) -> list:
+        """
+        Execute a single-column SQL query and return its values as a list.
+        Skips the DataFrame round trip for option lists that are used as plain lists.
+        
+        Args:
+            query: SQL query string selecting one column
+            params: Query parameters for safe parameterized queries
+            
+        Returns:
+            list: First-column values in result order
+        """
+        conn = self.get_connection()
+        if conn is None:
+            return []
+            
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            values = [row[0] for row in cursor.fetchall()]
+            logger.info(f"Query returned {len(values)} rows")
+            cursor.close()
+            return values
+            
+        except Exception as e:
+            logger.error(f"Query execution failed: {e}")
+            st.error(f"Query failed: {e}")
+            _mark_query_failed()
+            return []
+        finally:
+            conn.close()
+
+    def _get_pooled_connection(self, report_errors: bool = True) -> Optional[PreparedStatementConnection]:
+        """
+        Borrow a long-lived connection from the pool, creating the pool on first use.
+        Blocks until a slot is free; hand the connection back with _release_pooled_connection.
+        
+        Args:
+            report_errors: Show connection failures in the app; callers with their own
+                fallback pass False so a failure is only logged
+        """
+        self._pool_slots.acquire()
+        try:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = psycopg2.pool.ThreadedConnectionPool(
+                        1, self.POOL_MAX_CONNECTIONS,
+                        connection_factory=PreparedStatementConnection,
+                        **self.connection_params
+                    )
+            conn = self._pool.getconn()
+            conn.autocommit = True
+            return conn
+        except Exception as e:
+            self._pool_slots.release()
+            logger.error(f"Database connection failed: {e}")
+            if report_errors:
+                st.error(f"Failed to connect to database: {e}")
+            return None
+
+    def _release_pooled_connection(self, conn, close: bool = False) -> None:
+        """Return a borrowed connection to the pool and free its slot."""
+        try:
+            self._pool.putconn(conn, close=close)
+        finally:
+            self._pool_slots.release()
+
+    def execute_prepared(self, name: str, params: tuple) -> pd.DataFrame:
+        """
+        Execute one of the registered PREPARED_QUERIES and return results as a DataFrame.
+        The statement is PREPAREd once per pooled session, so repeat calls skip parse and plan.
+        
+        Args:
+            name: Key of the statement in PREPARED_QUERIES
+            params: Positional values for the statement's $1..$n parameters
+            
+        Returns:
+            pandas.DataFrame: Query results
+        """
+        # Every idle pooled session may have been dropped by the server (e.g. a managed
+        # Postgres suspending idle compute), so allow one retry per pooled slot: the last
+        # attempt is then guaranteed a newly opened connection
+        for attempt in range(self.POOL_MAX_CONNECTIONS + 1):
+            conn = self._get_pooled_connection()
+            if conn is None:
+                _mark_query_failed()
+                return pd.DataFrame()
+
+            discard = False
+            try:
+                return self._run_prepared(conn, name, params)
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                # Session is gone; drop it from the pool and retry on another one
+                discard = True
+                error = e
+                logger.warning(f"Prepared statement {name} lost its connection (attempt {attempt + 1}): {e}")
+            except Exception as e:
+                error = e
+                break
+            finally:
+                self._release_pooled_connection(conn, close=discard)
+
+        logger.error(f"Prepared statement {name} failed: {error}")
+        st.error(f"Query failed: {error}")
+        _mark_query_failed()
+        return pd.DataFrame()
+
+    def _run_prepared(self, conn: PreparedStatementConnection, name: str, params: tuple) -> pd.DataFrame:
+        """PREPARE name on conn if needed, EXECUTE it and return the rows as a DataFrame."""
+        cursor = conn.cursor()
+        try:
+            placeholders = ', '.join(['%s'] * len(params))
+            logger.info(f"Executing prepared statement {name} with params: {params}")
+            for prepare_attempt in range(2):
+                if name not in conn.prepared:
+                    cursor.execute(f"PREPARE {name} AS {_resolve_query(name)}")
+                    conn.prepared.add(name)
+                try:
+                    cursor.execute(f"EXECUTE {name}({placeholders})", params)
+                    break
+                except psycopg2.errors.InvalidSqlStatementName:
+                    # The server session forgot the statement (DISCARD ALL, transaction
+                    # pooler); forget it here too and PREPARE it again
+                    conn.prepared.discard(name)
+                    if prepare_attempt:
+                        raise
+
+            results = cursor.fetchall()
+            logger.info(f"Query returned {len(results)} rows")
+
+            if results:
+                columns = [desc[0] for desc in cursor.description]
+                return pd.DataFrame(results, columns=columns)
             return pd.DataFrame()
+        finally:
+            cursor.close()
+
+    def get_connection_uri(self) -> str:
+        """Build a postgresql:// URI from the connection parameters (used by connectorx)."""
+        params = self.connection_params
+        user = quote(str(params.get('user') or ''), safe='')
+        password = quote(str(params.get('password') or ''), safe='')
+        uri = f"postgresql://{user}:{password}@{params.get('host')}:{params.get('port')}/{params.get('database')}"
+        if params.get('sslmode'):
+            uri += f"?sslmode={params['sslmode']}"
+        return uri
+
+    def execute_query_arrow(self, query: str, params: Optional[Dict[str, Any]] = None) -> Optional['pa.Table']:
+        """
+        Execute a SQL query through connectorx and return the result as an Arrow table.
+        Rows are decoded straight into columnar buffers instead of per-cell Python objects.
+        
+        Args:
+            query: SQL query string with %(name)s placeholders
+            params: Query parameters, bound client-side because connectorx takes plain SQL
+            
+        Returns:
+            pyarrow.Table, or None if connectorx is unavailable or the query failed
+            (callers fall back to the psycopg2 path)
+        """
+        if cx is None:
+            return None
+
+        try:
+            if params:
+                # Only needed to bind parameters; the psycopg2 fallback reports real failures
+                conn = self._get_pooled_connection(report_errors=False)
+                if conn is None:
+                    return None
+                try:
+                    cursor = conn.cursor()
+                    query = cursor.mogrify(query, params).decode(psycopg2.extensions.encodings[conn.encoding])
+                    cursor.close()
+                finally:
+                    self._release_pooled_connection(conn)
+
+            logger.info("Executing query via connectorx")
+            table = cx.read_sql(self.get_connection_uri(), query, return_type="arrow")
+            logger.info(f"Query returned {table.num_rows} rows")
+            return table
+        except Exception as e:
+            logger.warning(f"Arrow query failed, falling back to psycopg2: {e}")
+            return None
+
+    def execute_statements(self, statements: List[str]) -> bool:
+        """
+        Execute DDL/maintenance statements that return no rows in a single transaction.
+
+        Args:
+            statements: SQL statements to execute in order
+
+        Returns:
+            bool: True if every statement succeeded and was committed
+        """
+        conn = self.get_connection()
+        if conn is None:
+            return False
+
+        try:
+            cursor = conn.cursor()
+            for statement in statements:
+                cursor.execute(statement)
+            conn.commit()
+            cursor.close()
+            return True
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Statement execution failed: {e}")
+            return False
         finally:
             conn.close()
 
@@ -196,11 +472,114 @@ def get_db_manager():
     """Get cached database manager instance."""
     return DatabaseManager()
 
+# =============================================================================
+# CACHE INSTRUMENTATION
+# =============================================================================
+
+# Per-function counters for the tracked_cache_data wrappers (process-wide, like the cache)
+_cache_stats: Dict[str, Dict[str, float]] = {}
+_cache_stats_lock = threading.Lock()
+
+# Set by DatabaseManager when a query fails, so the tracked wrapper can keep the
+# fallback value (zeros, empty frame) a cached function returns out of the cache
+_query_state = threading.local()
+
+def _mark_query_failed() -> None:
+    """Flag the current cached computation as served from a failed query."""
+    _query_state.failed = True
+
+class _UncachedResult(Exception):
+    """Carries a result through st.cache_data without it being stored (exceptions are never cached)."""
+
+    def __init__(self, result: Any):
+        super().__init__()
+        self.result = result
+
+def _result_size(result: Any) -> int:
+    """Approximate in-memory size of a cached value in bytes."""
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(deep=True).sum())
+    return sys.getsizeof(result)
+
+def tracked_cache_data(**cache_kwargs):
+    """
+    Drop-in replacement for @st.cache_data that records calls, misses, time spent
+    computing on a miss and the size of the cached value. A call is a miss when the
+    wrapped function body actually runs; every other call was served from the cache.
+    
+    Args:
+        **cache_kwargs: Passed through to st.cache_data (e.g. ttl)
+    """
+    def decorator(func):
+        name = func.__name__
+        _cache_stats[name] = {'calls': 0, 'misses': 0, 'miss_seconds': 0.0, 'size_bytes': 0}
+
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            # Save the enclosing computation's flag so a nested cached call can't reset it
+            outer_failed = getattr(_query_state, 'failed', False)
+            _query_state.failed = False
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                failed = _query_state.failed
+                _query_state.failed = outer_failed or failed
+            elapsed = time.perf_counter() - start
+            with _cache_stats_lock:
+                stats = _cache_stats[name]
+                stats['misses'] += 1
+                stats['miss_seconds'] += elapsed
+                stats['size_bytes'] = _result_size(result)
+            if failed:
+                raise _UncachedResult(result)
+            return result
+
+        cached = st.cache_data(**cache_kwargs)(compute)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _cache_stats_lock:
+                _cache_stats[name]['calls'] += 1
+            try:
+                return cached(*args, **kwargs)
+            except _UncachedResult as uncached:
+                return uncached.result
+
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorator
+
+def get_cache_stats() -> pd.DataFrame:
+    """Summarize hit/miss counts, compute time and cached size per tracked function."""
+    with _cache_stats_lock:
+        snapshot = {name: dict(stats) for name, stats in _cache_stats.items()}
+
+    rows = []
+    for name, stats in snapshot.items():
+        misses = int(stats['misses'])
+        hits = max(int(stats['calls']) - misses, 0)
+        avg_miss = stats['miss_seconds'] / misses if misses else 0.0
+        rows.append({
+            'function': name,
+            'calls': int(stats['calls']),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / stats['calls'] * 100, 1) if stats['calls'] else 0.0,
+            'avg_miss_ms': round(avg_miss * 1000, 1),
+            'time_saved_s': round(hits * avg_miss, 2),
+            'size_kb': round(stats['size_bytes'] / 1024, 1)
+        })
+
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).sort_values('time_saved_s', ascending=False).reset_index(drop=True)
+
 # =============================================================================
 # CACHED QUERY FUNCTIONS
 # =============================================================================
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@tracked_cache_data(ttl=300)  # Cache for 5 minutes
 def get_enhanced_predictions(
     team_filter: Optional[str] = None,
     league_filter: Optional[str] = None,
@@ -334,7 +713,7 @@ def get_enhanced_predictions(
         logger.error(f"Query execution failed: {e}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@tracked_cache_data(ttl=300)  # Cache for 5 minutes
 def get_last_session_predictions() -> pd.DataFrame:
     """
     Get predictions from the most recent session only.
@@ -345,7 +724,7 @@ def get_last_session_predictions() -> pd.DataFrame:
     """
     return get_enhanced_predictions(last_session_only=True)
 
-@st.cache_data(ttl=600)  # Cache for 10 minutes
+@tracked_cache_data(ttl=600)  # Cache for 10 minutes
 def get_model_performance() -> pd.DataFrame:
     """Get model performance metrics from predicted_results_ha table."""
     db = get_db_manager()
@@ -371,7 +750,7 @@ def get_model_performance() -> pd.DataFrame:
     
     return db.execute_query(query)
 
-@st.cache_data(ttl=600)
+@tracked_cache_data(ttl=600)
 def get_league_statistics() -> pd.DataFrame:
     """Get league statistics from raw_data table."""
     db = get_db_manager()
@@ -401,7 +780,7 @@ def get_league_statistics() -> pd.DataFrame:
     
     return db.execute_query(query)
 
-@st.cache_data(ttl=600)
+@tracked_cache_data(ttl=600)
 def get_teams_with_coordinates() -> pd.DataFrame:
     """Get all teams with their geographical coordinates."""
     db = get_db_manager()
@@ -427,7 +806,7 @@ def get_teams_with_coordinates() -> pd.DataFrame:
     
     return db.execute_query(query)
 
-@st.cache_data(ttl=300)
+@tracked_cache_data(ttl=300)
 def get_recent_matches(limit: int = 50) -> pd.DataFrame:
     """Get recent matches for quick overview."""
     db = get_db_manager()
@@ -456,7 +835,7 @@ def get_recent_matches(limit: int = 50) -> pd.DataFrame:
     
     return db.execute_query(query, (limit,))
 
-@st.cache_data(ttl=1800)  # Cache for 30 minutes
+@tracked_cache_data(ttl=1800)  # Cache for 30 minutes
 def get_available_filters() -> Dict[str, List[str]]:
     """Get available filter options for dropdowns."""
     db = get_db_manager()
@@ -485,7 +864,7 @@ def get_available_filters() -> Dict[str, List[str]]:
         'models': models
     }
 
-@st.cache_data(ttl=600)
+@tracked_cache_data(ttl=600)
 def get_prediction_accuracy_over_time() -> pd.DataFrame:
     """Get prediction accuracy trends over time."""
     db = get_db_manager()
@@ -506,7 +885,7 @@ def get_prediction_accuracy_over_time() -> pd.DataFrame:
     
     return db.execute_query(query)
 
-@st.cache_data(ttl=600)
+@tracked_cache_data(ttl=600)
 def get_weather_impact_analysis() -> pd.DataFrame:
     """Analyze the impact of weather on predictions."""
     db = get_db_manager()
@@ -567,6 +946,11 @@ def test_database_connection() -> bool:
             return False
     return False
 
+@functools.lru_cache(maxsize=1)
+def test_database_connection_once() -> bool:
+    """Test the database connection at most once per process (for launchers and scripts)."""
+    return test_database_connection()
+
 def get_table_info(table_name: str) -> pd.DataFrame:
     """Get column information for a specific table."""
     db = get_db_manager()
@@ -587,11 +971,314 @@ def get_table_info(table_name: str) -> pd.DataFrame:
     
     return db.execute_query(query, (table_name,))
 
+@tracked_cache_data(ttl=600)
+def relation_exists(relation_name: str) -> bool:
+    """Check whether a table or (materialized) view exists in the database."""
+    db = get_db_manager()
+    result = db.execute_query("SELECT to_regclass(%s) IS NOT NULL AS present", (relation_name,))
+    return bool(not result.empty and result.iloc[0]['present'])
+
+# ==========================================
+# PRECOMPUTED AGGREGATES FOR MODEL_RAW_DATA
+# ==========================================
+
+# Finished games only (RESULT in H/D/A). Every model_raw_data query filters on this,
+# so reading from the view drops the predicate and its indexes cover valid rows only.
+VALID_RAW_DATA_VIEW = 'model_raw_data_valid'
+
+# Inline stand-in used until create_support_objects() has built the view
+_VALID_RAW_DATA_FALLBACK = f"""(SELECT * FROM model_raw_data WHERE "RESULT" IN ('H', 'D', 'A')) AS {VALID_RAW_DATA_VIEW}"""
+
+# Per league/season/day rollup of finished games. The goals & shots analytics
+# sum these few thousand rows instead of scanning model_raw_data on every
+# filter change. Team filters need per-game rows, so they still hit the base table.
+LEAGUE_SEASON_AGG_VIEW = 'mv_league_season_agg'
+
+SUPPORT_OBJECTS_DDL = [
+    f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {VALID_RAW_DATA_VIEW} AS
+    SELECT * FROM model_raw_data
+    WHERE "RESULT" IN ('H', 'D', 'A')
+    """,
+    f"""
+    CREATE INDEX IF NOT EXISTS ix_{VALID_RAW_DATA_VIEW}_league_season
+    ON {VALID_RAW_DATA_VIEW} ("League", "Season", "GameDate")
+    """,
+    f"""CREATE INDEX IF NOT EXISTS ix_{VALID_RAW_DATA_VIEW}_season ON {VALID_RAW_DATA_VIEW} ("Season")""",
+    f"""CREATE INDEX IF NOT EXISTS ix_{VALID_RAW_DATA_VIEW}_ht ON {VALID_RAW_DATA_VIEW} ("HT")""",
+    f"""CREATE INDEX IF NOT EXISTS ix_{VALID_RAW_DATA_VIEW}_at ON {VALID_RAW_DATA_VIEW} ("AT")""",
+    f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {LEAGUE_SEASON_AGG_VIEW} AS
+    SELECT
+        "League",
+        "Season",
+        "GameDate",
+        COUNT(*) as total_games,
+        COUNT("HT_Score" + "AT_Score") as goal_games,
+        SUM("HT_Score" + "AT_Score") as sum_goals,
+        SUM(
+            CASE WHEN "HT_Shots"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "HT_Shots"::NUMERIC ELSE 0 END +
+            CASE WHEN "AT_Shots"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AT_Shots"::NUMERIC ELSE 0 END
+        ) as sum_shots
+    FROM {VALID_RAW_DATA_VIEW}
+    GROUP BY "League", "Season", "GameDate"
+    """,
+    # REFRESH ... CONCURRENTLY requires a unique index over plain columns
+    f"""
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_{LEAGUE_SEASON_AGG_VIEW}
+    ON {LEAGUE_SEASON_AGG_VIEW} ("League", "Season", "GameDate")
+    """,
+    # Lets the "latest season" lookup in get_team_statistics stop after one index entry
+    "CREATE INDEX IF NOT EXISTS ix_ts_season ON team_statistics (season DESC)"
+]
+
+# Refresh order matters: the rollup is built from the filtered view
+SUPPORT_VIEWS = [VALID_RAW_DATA_VIEW, LEAGUE_SEASON_AGG_VIEW]
+
+# model_raw_data has no natural unique key, so only the rollup can refresh CONCURRENTLY
+_CONCURRENT_REFRESH_VIEWS = {LEAGUE_SEASON_AGG_VIEW}
+
+def create_support_objects() -> bool:
+    """Create the materialized views and indexes used to speed up the analytics queries."""
+    db = get_db_manager()
+    created = db.execute_statements(SUPPORT_OBJECTS_DDL)
+    relation_exists.clear()
+    return created
+
+def refresh_support_views() -> bool:
+    """
+    Refresh the precomputed aggregates. Must be called after each model_raw_data ingest:
+    once the views exist the dashboard reads finished games from them, not the base table.
+    """
+    db = get_db_manager()
+    refreshed = True
+    # One transaction per view: the plain refresh holds an ACCESS EXCLUSIVE lock until
+    # commit, so batching would keep dashboard reads blocked through the rollup refresh too
+    for view in SUPPORT_VIEWS:
+        concurrently = 'CONCURRENTLY ' if view in _CONCURRENT_REFRESH_VIEWS else ''
+        if not db.execute_statements([f"REFRESH MATERIALIZED VIEW {concurrently}{view}"]):
+            refreshed = False
+            break
+    return refreshed
+
+def _valid_raw_data_source() -> str:
+    """FROM-clause source for finished games: the filtered view, or its inline equivalent."""
+    if relation_exists(VALID_RAW_DATA_VIEW):
+        return VALID_RAW_DATA_VIEW
+    return _VALID_RAW_DATA_FALLBACK
+
+# ==========================================
+# PREPARED QUERY SHAPES
+# ==========================================
+
+# Every filter is an array/date parameter with NULL meaning "no filter", so each
+# query has one stable SQL text that DatabaseManager.execute_prepared PREPAREs
+# once per session. Parameters: $1 leagues, $2 seasons, $3 teams, $4 date_from,
+# $5 date_to (the rollup view has no team column, so it takes $1, $2, $3, $4 dates).
+_RAW_DATA_FILTERS = """
+    ("League" = ANY($1) OR $1 IS NULL)
+    AND ("Season" = ANY($2) OR $2 IS NULL)
+    AND ("HT" = ANY($3) OR "AT" = ANY($3) OR $3 IS NULL)
+    AND ("GameDate" >= $4 OR $4 IS NULL)
+    AND ("GameDate" <= $5 OR $5 IS NULL)
+"""
+
+_AGG_VIEW_FILTERS = """
+    ("League" = ANY($1) OR $1 IS NULL)
+    AND ("Season" = ANY($2) OR $2 IS NULL)
+    AND ("GameDate" >= $3 OR $3 IS NULL)
+    AND ("GameDate" <= $4 OR $4 IS NULL)
+"""
+
+_SHOTS_SQL = """
+    CASE WHEN "HT_Shots"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "HT_Shots"::NUMERIC ELSE 0 END +
+    CASE WHEN "AT_Shots"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AT_Shots"::NUMERIC ELSE 0 END
+"""
+
+PREPARED_QUERIES = {
+    'mrd_key_metrics': f"""
+    WITH filtered AS (
+        SELECT "League", "Season", "HT", "AT"
+        FROM {VALID_RAW_DATA_VIEW}
+        WHERE {_RAW_DATA_FILTERS}
+    )
+    SELECT
+        COUNT(*) as total_games,
+        COUNT(DISTINCT "League") as total_leagues,
+        COUNT(DISTINCT "Season") as total_seasons,
+        (SELECT COUNT(*) FROM (
+            SELECT "HT" as team FROM filtered
+            UNION
+            SELECT "AT" as team FROM filtered
+        ) as unique_teams) as total_teams
+    FROM filtered
+    """,
+    'mrd_analytics': f"""
+    SELECT
+        COUNT(CASE WHEN "RESULT" = 'H' THEN 1 END) as home_wins,
+        COUNT(CASE WHEN "RESULT" = 'A' THEN 1 END) as away_wins,
+        COUNT(CASE WHEN "RESULT" = 'D' THEN 1 END) as draws,
+        COUNT(*) as total_games,
+        COALESCE(ROUND(AVG("HT_Score" + "AT_Score")::NUMERIC, 2), 0)::FLOAT8 as avg_goals,
+        COALESCE(ROUND(AVG({_SHOTS_SQL})::NUMERIC, 2), 0)::FLOAT8 as avg_shots,
+        COALESCE(ROUND(AVG(CASE WHEN "RESULT" = 'H' AND "AvgH"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AvgH"::NUMERIC ELSE NULL END)::NUMERIC, 2), 0)::FLOAT8 as avg_winning_home_odds,
+        COALESCE(ROUND(AVG(CASE WHEN "RESULT" = 'D' AND "AvgD"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AvgD"::NUMERIC ELSE NULL END)::NUMERIC, 2), 0)::FLOAT8 as avg_winning_draw_odds,
+        COALESCE(ROUND(AVG(CASE WHEN "RESULT" = 'A' AND "AvgA"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AvgA"::NUMERIC ELSE NULL END)::NUMERIC, 2), 0)::FLOAT8 as avg_winning_away_odds,
+        COALESCE(ROUND(AVG(CASE WHEN "AvgH"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AvgH"::NUMERIC ELSE NULL END)::NUMERIC, 2), 0)::FLOAT8 as avg_overall_home_odds,
+        COALESCE(ROUND(AVG(CASE WHEN "AvgD"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AvgD"::NUMERIC ELSE NULL END)::NUMERIC, 2), 0)::FLOAT8 as avg_overall_draw_odds,
+        COALESCE(ROUND(AVG(CASE WHEN "AvgA"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AvgA"::NUMERIC ELSE NULL END)::NUMERIC, 2), 0)::FLOAT8 as avg_overall_away_odds
+    FROM {VALID_RAW_DATA_VIEW}
+    WHERE {_RAW_DATA_FILTERS}
+    """,
+    'mrd_goals_shots': f"""
+    SELECT
+        COALESCE(ROUND(AVG("HT_Score" + "AT_Score")::NUMERIC, 2), 0)::FLOAT8 as avg_goals,
+        COALESCE(ROUND(AVG({_SHOTS_SQL})::NUMERIC, 2), 0)::FLOAT8 as avg_shots,
+        COUNT(*) as total_games
+    FROM {VALID_RAW_DATA_VIEW}
+    WHERE {_RAW_DATA_FILTERS}
+    """,
+    'mrd_goals_shots_agg': f"""
+    SELECT
+        COALESCE(ROUND(SUM(sum_goals)::NUMERIC / NULLIF(SUM(goal_games), 0), 2), 0)::FLOAT8 as avg_goals,
+        COALESCE(ROUND(SUM(sum_shots) / NULLIF(SUM(total_games), 0), 2), 0)::FLOAT8 as avg_shots,
+        COALESCE(SUM(total_games), 0)::BIGINT as total_games
+    FROM {LEAGUE_SEASON_AGG_VIEW}
+    WHERE {_AGG_VIEW_FILTERS}
+    """,
+    'mrd_league_goals_shots': f"""
+    WITH league_totals AS (
+        SELECT
+            "League" as league,
+            COUNT(*) as total_games,
+            AVG("HT_Score" + "AT_Score") as avg_goals,
+            AVG({_SHOTS_SQL}) as avg_shots
+        FROM {VALID_RAW_DATA_VIEW}
+        WHERE "League" IS NOT NULL AND {_RAW_DATA_FILTERS}
+        GROUP BY "League"
+    )
+    SELECT
+        league,
+        total_games,
+        ROUND(avg_goals::NUMERIC, 2)::FLOAT8 as avg_goals,
+        ROUND(avg_shots::NUMERIC, 2)::FLOAT8 as avg_shots,
+        CASE
+            WHEN avg_shots > 0
+            THEN ROUND(CAST((avg_goals / avg_shots) * 100 AS NUMERIC), 1)
+            ELSE 0
+        END::FLOAT8 as goals_shots_percentage
+    FROM league_totals
+    ORDER BY avg_goals DESC
+    """,
+    'mrd_league_goals_shots_agg': f"""
+    WITH league_totals AS (
+        SELECT
+            "League" as league,
+            SUM(total_games)::BIGINT as total_games,
+            SUM(sum_goals)::NUMERIC / NULLIF(SUM(goal_games), 0) as avg_goals,
+            SUM(sum_shots) / NULLIF(SUM(total_games), 0) as avg_shots
+        FROM {LEAGUE_SEASON_AGG_VIEW}
+        WHERE "League" IS NOT NULL AND {_AGG_VIEW_FILTERS}
+        GROUP BY "League"
+    )
+    SELECT
+        league,
+        total_games,
+        ROUND(avg_goals::NUMERIC, 2)::FLOAT8 as avg_goals,
+        ROUND(avg_shots::NUMERIC, 2)::FLOAT8 as avg_shots,
+        CASE
+            WHEN avg_shots > 0
+            THEN ROUND(CAST((avg_goals / avg_shots) * 100 AS NUMERIC), 1)
+            ELSE 0
+        END::FLOAT8 as goals_shots_percentage
+    FROM league_totals
+    ORDER BY avg_goals DESC
+    """,
+    'league_table': """
+    SELECT
+        team,
+        league,
+        season,
+        league_rank,
+        total_points,
+        total_games_played,
+        total_goals_scored,
+        total_goals_conceded,
+        (total_goals_scored - total_goals_conceded) AS goal_difference,
+        last_5_games,
+        CASE
+            WHEN total_games_played > 0
+            THEN ROUND(CAST(total_points AS NUMERIC) / total_games_played, 2)
+            ELSE 0
+        END AS points_per_game
+    FROM team_statistics
+    WHERE (league = ANY($1) OR $1 IS NULL)
+        AND (season = ANY($2) OR $2 IS NULL)
+        AND (team = ANY($3) OR $3 IS NULL)
+    ORDER BY league, season, league_rank
+    """,
+    # $1 season (NULL = latest season in the table), $2 teams
+    'team_statistics': """
+    WITH s AS (
+        SELECT COALESCE($1, (SELECT season FROM team_statistics ORDER BY season DESC LIMIT 1)) AS season
+    )
+    SELECT
+        team,
+        league_rank,
+        total_points,
+        total_goals_scored,
+        total_goals_conceded,
+        last_5_games
+    FROM team_statistics, s
+    WHERE team = ANY($2) AND team_statistics.season = s.season
+    """
+}
+
+def _resolve_query(name: str) -> str:
+    """SQL text for a PREPARED_QUERIES shape, reading from base rows if the filtered view is missing."""
+    source = _valid_raw_data_source()
+    query = PREPARED_QUERIES[name]
+    if source == VALID_RAW_DATA_VIEW:
+        return query
+    return query.replace(f'FROM {VALID_RAW_DATA_VIEW}', f'FROM {source}')
+
+def _pyformat_query(name: str, params: tuple) -> Tuple[str, Dict[str, Any]]:
+    """Rewrite a PREPARED_QUERIES shape to %(pN)s placeholders for clients that cannot EXECUTE it."""
+    query = re.sub(r'\$(\d+)', r'%(p\1)s', _resolve_query(name))
+    return query, {f'p{i}': value for i, value in enumerate(params, start=1)}
+
+def _as_filter_array(value: Any) -> Optional[List[str]]:
+    """Normalize a str/list filter to a list, or None when the filter is unset."""
+    if not value:
+        return None
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+def _raw_data_filter_params(league_filter, season_filter, team_filter, date_from, date_to) -> tuple:
+    """Positional parameters for the model_raw_data query shapes."""
+    return (
+        _as_filter_array(league_filter),
+        _as_filter_array(season_filter),
+        _as_filter_array(team_filter),
+        date_from or None,
+        date_to or None
+    )
+
+def _agg_view_filter_params(league_filter, season_filter, date_from, date_to) -> tuple:
+    """Positional parameters for the rollup view query shapes (no team filter)."""
+    return (
+        _as_filter_array(league_filter),
+        _as_filter_array(season_filter),
+        date_from or None,
+        date_to or None
+    )
+
 # ==========================================
 # NEW QUERY FUNCTIONS FOR MODEL_RAW_DATA
 # ==========================================
 
-@st.cache_data(ttl=600)  # Cache for 10 minutes
+@tracked_cache_data(ttl=600)  # Cache for 10 minutes
 def get_raw_data_key_metrics(
     league_filter: Optional[str] = None,
     season_filter: Optional[str] = None,
@@ -613,94 +1300,25 @@ def get_raw_data_key_metrics(
         dict: Key metrics data
     """
     db = get_db_manager()
-    
-    # Build WHERE clause dynamically with multi-select support
-    where_conditions = []
-    params = []
-    
-    if league_filter:
-        if isinstance(league_filter, list) and league_filter:
-            placeholders = ','.join(['%s'] * len(league_filter))
-            where_conditions.append(f'"League" IN ({placeholders})')
-            params.extend(league_filter)
-        elif isinstance(league_filter, str):
-            where_conditions.append('"League" = %s')
-            params.append(league_filter)
-        
-    if season_filter:
-        if isinstance(season_filter, list) and season_filter:
-            placeholders = ','.join(['%s'] * len(season_filter))
-            where_conditions.append(f'"Season" IN ({placeholders})')
-            params.extend(season_filter)
-        elif isinstance(season_filter, str):
-            where_conditions.append('"Season" = %s')
-            params.append(season_filter)
-        
-    if team_filter:
-        if isinstance(team_filter, list) and team_filter:
-            # For multiple teams, use IN clause for both home and away
-            placeholders = ','.join(['%s'] * len(team_filter))
-            where_conditions.append(f'("HT" IN ({placeholders}) OR "AT" IN ({placeholders}))')
-            params.extend(team_filter + team_filter)  # Add teams twice for HT and AT
-        elif isinstance(team_filter, str):
-            where_conditions.append('("HT" = %s OR "AT" = %s)')
-            params.extend([team_filter, team_filter])
-        
-    if date_from:
-        where_conditions.append('"GameDate" >= %s')
-        params.append(date_from)
-        
-    if date_to:
-        where_conditions.append('"GameDate" <= %s')
-        params.append(date_to)
-    
-    where_clause = ""
-    if where_conditions:
-        where_clause = " AND " + " AND ".join(where_conditions)
-    
-    # Query for key metrics
-    metrics_query = f"""
-    SELECT 
-        COUNT(*) as total_games,
-        COUNT(DISTINCT "League") as total_leagues,
-        COUNT(DISTINCT "Season") as total_seasons
-    FROM model_raw_data 
-    WHERE "RESULT" IN ('H', 'D', 'A') {where_clause}
-    """
-    
-    # Separate query for teams count
-    teams_query = f"""
-    SELECT COUNT(*) as total_teams FROM (
-        SELECT "HT" as team FROM model_raw_data WHERE "RESULT" IN ('H', 'D', 'A') {where_clause}
-        UNION
-        SELECT "AT" as team FROM model_raw_data WHERE "RESULT" IN ('H', 'D', 'A') {where_clause}
-    ) as unique_teams
-    """
+    params = _raw_data_filter_params(league_filter, season_filter, team_filter, date_from, date_to)
     
     try:
-        params_tuple = tuple(params) if params else None
-        
-        # Get basic metrics
-        result = db.execute_query(metrics_query, params_tuple)
-        
-        # For teams query, we need to duplicate params since we use the where_clause twice
-        teams_params = tuple(params + params) if params else None
-        teams_result = db.execute_query(teams_query, teams_params)
+        result = db.execute_prepared('mrd_key_metrics', params)
         
         if not result.empty:
-            metrics = {
-                'total_games': int(result.iloc[0]['total_games']),
-                'total_leagues': int(result.iloc[0]['total_leagues']),
-                'total_seasons': int(result.iloc[0]['total_seasons']),
-                'total_teams': int(teams_result.iloc[0]['total_teams']) if not teams_result.empty else 0
+            row = result.iloc[0]
+            return {
+                'total_games': int(row['total_games']),
+                'total_leagues': int(row['total_leagues']),
+                'total_seasons': int(row['total_seasons']),
+                'total_teams': int(row['total_teams'])
             }
-            return metrics
     except Exception as e:
         logger.error(f"Key metrics query failed: {e}")
     
     return {'total_games': 0, 'total_leagues': 0, 'total_seasons': 0, 'total_teams': 0}
 
-@st.cache_data(ttl=600)  # Cache for 10 minutes
+@tracked_cache_data(ttl=600)  # Cache for 10 minutes
 def get_raw_data_analytics(
     league_filter: Optional[str] = None,
     season_filter: Optional[str] = None,
@@ -722,74 +1340,10 @@ def get_raw_data_analytics(
         dict: Analytics data
     """
     db = get_db_manager()
-    
-    # Build WHERE clause dynamically with multi-select support
-    where_conditions = []
-    params = []
-    
-    if league_filter:
-        if isinstance(league_filter, list) and league_filter:
-            placeholders = ','.join(['%s'] * len(league_filter))
-            where_conditions.append(f'"League" IN ({placeholders})')
-            params.extend(league_filter)
-        elif isinstance(league_filter, str):
-            where_conditions.append('"League" = %s')
-            params.append(league_filter)
-        
-    if season_filter:
-        if isinstance(season_filter, list) and season_filter:
-            placeholders = ','.join(['%s'] * len(season_filter))
-            where_conditions.append(f'"Season" IN ({placeholders})')
-            params.extend(season_filter)
-        elif isinstance(season_filter, str):
-            where_conditions.append('"Season" = %s')
-            params.append(season_filter)
-        
-    if team_filter:
-        if isinstance(team_filter, list) and team_filter:
-            placeholders = ','.join(['%s'] * len(team_filter))
-            where_conditions.append(f'("HT" IN ({placeholders}) OR "AT" IN ({placeholders}))')
-            params.extend(team_filter + team_filter)
-        elif isinstance(team_filter, str):
-            where_conditions.append('("HT" = %s OR "AT" = %s)')
-            params.extend([team_filter, team_filter])
-        
-    if date_from:
-        where_conditions.append('"GameDate" >= %s')
-        params.append(date_from)
-        
-    if date_to:
-        where_conditions.append('"GameDate" <= %s')
-        params.append(date_to)
-    
-    where_clause = ""
-    if where_conditions:
-        where_clause = " AND " + " AND ".join(where_conditions)
-    
-    analytics_query = f"""
-    SELECT 
-        COUNT(CASE WHEN "RESULT" = 'H' THEN 1 END) as home_wins,
-        COUNT(CASE WHEN "RESULT" = 'A' THEN 1 END) as away_wins,
-        COUNT(CASE WHEN "RESULT" = 'D' THEN 1 END) as draws,
-        COUNT(*) as total_games,
-        AVG("HT_Score" + "AT_Score") as avg_goals,
-        AVG(
-            CASE WHEN "HT_Shots"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "HT_Shots"::NUMERIC ELSE 0 END + 
-            CASE WHEN "AT_Shots"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AT_Shots"::NUMERIC ELSE 0 END
-        ) as avg_shots,
-        AVG(CASE WHEN "RESULT" = 'H' AND "AvgH"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AvgH"::NUMERIC ELSE NULL END) as avg_winning_home_odds,
-        AVG(CASE WHEN "RESULT" = 'D' AND "AvgD"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AvgD"::NUMERIC ELSE NULL END) as avg_winning_draw_odds,
-        AVG(CASE WHEN "RESULT" = 'A' AND "AvgA"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AvgA"::NUMERIC ELSE NULL END) as avg_winning_away_odds,
-        AVG(CASE WHEN "AvgH"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AvgH"::NUMERIC ELSE NULL END) as avg_overall_home_odds,
-        AVG(CASE WHEN "AvgD"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AvgD"::NUMERIC ELSE NULL END) as avg_overall_draw_odds,
-        AVG(CASE WHEN "AvgA"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AvgA"::NUMERIC ELSE NULL END) as avg_overall_away_odds
-    FROM model_raw_data 
-    WHERE "RESULT" IN ('H', 'D', 'A') {where_clause}
-    """
+    params = _raw_data_filter_params(league_filter, season_filter, team_filter, date_from, date_to)
     
     try:
-        params_tuple = tuple(params) if params else None
-        result = db.execute_query(analytics_query, params_tuple)
+        result = db.execute_prepared('mrd_analytics', params)
             
         if not result.empty:
             row = result.iloc[0]
@@ -803,17 +1357,14 @@ def get_raw_data_analytics(
                 'home_percentage': round((row['home_wins'] / total_games * 100) if total_games > 0 else 0, 1),
                 'away_percentage': round((row['away_wins'] / total_games * 100) if total_games > 0 else 0, 1),
                 'draw_percentage': round((row['draws'] / total_games * 100) if total_games > 0 else 0, 1),
-                'avg_goals': round(float(row['avg_goals']) if row['avg_goals'] is not None else 0, 2),
-                'avg_shots': round(float(row['avg_shots']) if row['avg_shots'] is not None else 0, 2),
-                'avg_winning_home_odds': round(float(row['avg_winning_home_odds']) if row['avg_winning_home_odds'] is not None else 0, 2),
-                'avg_winning_draw_odds': round(float(row['avg_winning_draw_odds']) if row['avg_winning_draw_odds'] is not None else 0, 2),
-                'avg_winning_away_odds': round(float(row['avg_winning_away_odds']) if row['avg_winning_away_odds'] is not None else 0, 2),
-                'avg_overall_home_odds': round(float(row['avg_overall_home_odds']) if row['avg_overall_home_odds'] is not None else 0, 2),
-                'avg_overall_draw_odds': round(float(row['avg_overall_draw_odds']) if row['avg_overall_draw_odds'] is not None else 0, 2),
-                'avg_overall_away_odds': round(float(row['avg_overall_away_odds']) if row['avg_overall_away_odds'] is not None else 0, 2),
-                'avg_overall_home_odds': round(float(row['avg_overall_home_odds']) if pd.notnull(row['avg_overall_home_odds']) else 0, 2),
-                'avg_overall_draw_odds': round(float(row['avg_overall_draw_odds']) if pd.notnull(row['avg_overall_draw_odds']) else 0, 2),
-                'avg_overall_away_odds': round(float(row['avg_overall_away_odds']) if pd.notnull(row['avg_overall_away_odds']) else 0, 2)
+                'avg_goals': float(row['avg_goals']),
+                'avg_shots': float(row['avg_shots']),
+                'avg_winning_home_odds': float(row['avg_winning_home_odds']),
+                'avg_winning_draw_odds': float(row['avg_winning_draw_odds']),
+                'avg_winning_away_odds': float(row['avg_winning_away_odds']),
+                'avg_overall_home_odds': float(row['avg_overall_home_odds']),
+                'avg_overall_draw_odds': float(row['avg_overall_draw_odds']),
+                'avg_overall_away_odds': float(row['avg_overall_away_odds'])
             }
     except Exception as e:
         logger.error(f"Analytics query failed: {e}")
@@ -827,33 +1378,31 @@ def get_raw_data_analytics(
         'avg_overall_home_odds': 0, 'avg_overall_draw_odds': 0, 'avg_overall_away_odds': 0
     }
 
-@st.cache_data(ttl=600)
+@tracked_cache_data(ttl=600)
 def get_raw_data_leagues() -> list:
     """Get list of available leagues from model_raw_data."""
     db = get_db_manager()
-    query = 'SELECT DISTINCT "League" FROM model_raw_data WHERE "League" IS NOT NULL AND "RESULT" IN (\'H\', \'D\', \'A\') ORDER BY "League"'
+    query = f'SELECT DISTINCT "League" FROM {_valid_raw_data_source()} WHERE "League" IS NOT NULL ORDER BY "League"'
     
     try:
-        result = db.execute_query(query)
-        return result['League'].tolist() if not result.empty else []
+        return db.execute_list(query)
     except Exception as e:
         logger.error(f"Failed to get leagues: {e}")
         return []
 
-@st.cache_data(ttl=600)
+@tracked_cache_data(ttl=600)
 def get_raw_data_seasons() -> list:
     """Get list of available seasons from model_raw_data."""
     db = get_db_manager()
-    query = 'SELECT DISTINCT "Season" FROM model_raw_data WHERE "Season" IS NOT NULL AND "RESULT" IN (\'H\', \'D\', \'A\') ORDER BY "Season" DESC'
+    query = f'SELECT DISTINCT "Season" FROM {_valid_raw_data_source()} WHERE "Season" IS NOT NULL ORDER BY "Season" DESC'
     
     try:
-        result = db.execute_query(query)
-        return result['Season'].tolist() if not result.empty else []
+        return db.execute_list(query)
     except Exception as e:
         logger.error(f"Failed to get seasons: {e}")
         return []
 
-@st.cache_data(ttl=600)
+@tracked_cache_data(ttl=600)
 def get_goals_shots_filtered_data(
     league_filter: Optional[str] = None,
     season_filter: Optional[str] = None,
@@ -877,70 +1426,23 @@ def get_goals_shots_filtered_data(
     """
     db = get_db_manager()
     
-    # Build WHERE clause dynamically with multi-select support
-    where_conditions = []
-    params = []
-    
-    if league_filter:
-        if isinstance(league_filter, list) and league_filter:
-            placeholders = ','.join(['%s'] * len(league_filter))
-            where_conditions.append(f'"League" IN ({placeholders})')
-            params.extend(league_filter)
-        elif isinstance(league_filter, str):
-            where_conditions.append('"League" = %s')
-            params.append(league_filter)
-        
-    if season_filter:
-        if isinstance(season_filter, list) and season_filter:
-            placeholders = ','.join(['%s'] * len(season_filter))
-            where_conditions.append(f'"Season" IN ({placeholders})')
-            params.extend(season_filter)
-        elif isinstance(season_filter, str):
-            where_conditions.append('"Season" = %s')
-            params.append(season_filter)
-        
-    if team_filter:
-        if isinstance(team_filter, list) and team_filter:
-            placeholders = ','.join(['%s'] * len(team_filter))
-            where_conditions.append(f'("HT" IN ({placeholders}) OR "AT" IN ({placeholders}))')
-            params.extend(team_filter + team_filter)
-        elif isinstance(team_filter, str):
-            where_conditions.append('("HT" = %s OR "AT" = %s)')
-            params.extend([team_filter, team_filter])
-        
-    if date_from:
-        where_conditions.append('"GameDate" >= %s')
-        params.append(date_from)
-        
-    if date_to:
-        where_conditions.append('"GameDate" <= %s')
-        params.append(date_to)
-    
-    where_clause = ""
-    if where_conditions:
-        where_clause = " AND " + " AND ".join(where_conditions)
-    
-    query = f"""
-    SELECT 
-        AVG("HT_Score" + "AT_Score") as avg_goals,
-        AVG(
-            CASE WHEN "HT_Shots"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "HT_Shots"::NUMERIC ELSE 0 END + 
-            CASE WHEN "AT_Shots"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AT_Shots"::NUMERIC ELSE 0 END
-        ) as avg_shots,
-        COUNT(*) as total_games
-    FROM model_raw_data 
-    WHERE "RESULT" IN ('H', 'D', 'A') {where_clause}
-    """
-    
     try:
-        params_tuple = tuple(params) if params else None
-        result = db.execute_query(query, params_tuple)
+        if not team_filter and relation_exists(LEAGUE_SEASON_AGG_VIEW):
+            result = db.execute_prepared(
+                'mrd_goals_shots_agg',
+                _agg_view_filter_params(league_filter, season_filter, date_from, date_to)
+            )
+        else:
+            result = db.execute_prepared(
+                'mrd_goals_shots',
+                _raw_data_filter_params(league_filter, season_filter, team_filter, date_from, date_to)
+            )
             
         if not result.empty:
             row = result.iloc[0]
             return {
-                'avg_goals': round(float(row['avg_goals']) if pd.notnull(row['avg_goals']) else 0, 2),
-                'avg_shots': round(float(row['avg_shots']) if pd.notnull(row['avg_shots']) else 0, 2),
+                'avg_goals': float(row['avg_goals']),
+                'avg_shots': float(row['avg_shots']),
                 'total_games': int(row['total_games'])
             }
     except Exception as e:
@@ -948,47 +1450,30 @@ def get_goals_shots_filtered_data(
     
     return {'avg_goals': 0, 'avg_shots': 0, 'total_games': 0}
 
-@st.cache_data(ttl=600)  # Cache for 10 minutes
-def get_teams():
+@tracked_cache_data(ttl=600)  # Cache for 10 minutes
+def get_teams() -> list:
     """Get list of available teams from model_raw_data."""
     db = get_db_manager()
-    query = '''
+    source = _valid_raw_data_source()
+    query = f'''
     SELECT team FROM (
-        SELECT "HT" as team FROM model_raw_data WHERE "HT" IS NOT NULL AND "RESULT" IN ('H', 'D', 'A')
+        SELECT "HT" as team FROM {source} WHERE "HT" IS NOT NULL
         UNION
-        SELECT "AT" as team FROM model_raw_data WHERE "AT" IS NOT NULL AND "RESULT" IN ('H', 'D', 'A')
+        SELECT "AT" as team FROM {source} WHERE "AT" IS NOT NULL
     ) as all_teams
     ORDER BY team
     '''
     
     try:
-        result = db.execute_query(query)
-        return result['team'].tolist() if not result.empty else []
+        return db.execute_list(query)
     except Exception as e:
         logger.error(f"Failed to get teams: {e}")
         return []
 
-@st.cache_data(ttl=600)
-def get_raw_data_teams() -> list:
-    """Get list of available teams from model_raw_data."""
-    db = get_db_manager()
-    query = '''
-    SELECT team FROM (
-        SELECT "HT" as team FROM model_raw_data WHERE "HT" IS NOT NULL AND "RESULT" IN ('H', 'D', 'A')
-        UNION
-        SELECT "AT" as team FROM model_raw_data WHERE "AT" IS NOT NULL AND "RESULT" IN ('H', 'D', 'A')
-    ) as all_teams
-    ORDER BY team
-    '''
-    
-    try:
-        result = db.execute_query(query)
-        return result['team'].tolist() if not result.empty else []
-    except Exception as e:
-        logger.error(f"Failed to get teams: {e}")
-        return []
+# Same team list; alias so both names share one cache entry and one query
+get_raw_data_teams = get_teams
 
-@st.cache_data(ttl=600)
+@tracked_cache_data(ttl=600)
 def get_league_goals_shots_analytics(
     league_filter: Optional[str] = None,
     season_filter: Optional[str] = None,
@@ -1011,85 +1496,22 @@ def get_league_goals_shots_analytics(
     """
     db = get_db_manager()
     
-    # Build WHERE clause dynamically with multi-select support
-    where_conditions = []
-    params = []
-    
-    if league_filter:
-        if isinstance(league_filter, list) and league_filter:
-            placeholders = ','.join(['%s'] * len(league_filter))
-            where_conditions.append(f'"League" IN ({placeholders})')
-            params.extend(league_filter)
-        elif isinstance(league_filter, str):
-            where_conditions.append('"League" = %s')
-            params.append(league_filter)
-        
-    if season_filter:
-        if isinstance(season_filter, list) and season_filter:
-            placeholders = ','.join(['%s'] * len(season_filter))
-            where_conditions.append(f'"Season" IN ({placeholders})')
-            params.extend(season_filter)
-        elif isinstance(season_filter, str):
-            where_conditions.append('"Season" = %s')
-            params.append(season_filter)
-        
-    if team_filter:
-        if isinstance(team_filter, list) and team_filter:
-            placeholders = ','.join(['%s'] * len(team_filter))
-            where_conditions.append(f'("HT" IN ({placeholders}) OR "AT" IN ({placeholders}))')
-            params.extend(team_filter + team_filter)
-        elif isinstance(team_filter, str):
-            where_conditions.append('("HT" = %s OR "AT" = %s)')
-            params.extend([team_filter, team_filter])
-        
-    if date_from:
-        where_conditions.append('"GameDate" >= %s')
-        params.append(date_from)
-        
-    if date_to:
-        where_conditions.append('"GameDate" <= %s')
-        params.append(date_to)
-    
-    where_clause = ""
-    if where_conditions:
-        where_clause = " AND " + " AND ".join(where_conditions)
-    
-    league_query = f"""
-    SELECT 
-        "League" as league,
-        COUNT(*) as total_games,
-        AVG("HT_Score" + "AT_Score") as avg_goals,
-        AVG(
-            CASE WHEN "HT_Shots"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "HT_Shots"::NUMERIC ELSE 0 END + 
-            CASE WHEN "AT_Shots"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AT_Shots"::NUMERIC ELSE 0 END
-        ) as avg_shots,
-        CASE 
-            WHEN AVG(
-                CASE WHEN "HT_Shots"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "HT_Shots"::NUMERIC ELSE 0 END + 
-                CASE WHEN "AT_Shots"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AT_Shots"::NUMERIC ELSE 0 END
-            ) > 0 
-            THEN ROUND(CAST((AVG("HT_Score" + "AT_Score") / AVG(
-                CASE WHEN "HT_Shots"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "HT_Shots"::NUMERIC ELSE 0 END + 
-                CASE WHEN "AT_Shots"::TEXT ~ '^[0-9]+\\.?[0-9]*$' THEN "AT_Shots"::NUMERIC ELSE 0 END
-            )) * 100 AS NUMERIC), 1)
-            ELSE 0 
-        END as goals_shots_percentage
-    FROM model_raw_data 
-    WHERE "RESULT" IN ('H', 'D', 'A') AND "League" IS NOT NULL {where_clause}
-    GROUP BY "League"
-    ORDER BY avg_goals DESC
-    """
-    
     try:
-        params_tuple = tuple(params) if params else None
-        result = db.execute_query(league_query, params_tuple)
-        return result
+        if not team_filter and relation_exists(LEAGUE_SEASON_AGG_VIEW):
+            return db.execute_prepared(
+                'mrd_league_goals_shots_agg',
+                _agg_view_filter_params(league_filter, season_filter, date_from, date_to)
+            )
+        return db.execute_prepared(
+            'mrd_league_goals_shots',
+            _raw_data_filter_params(league_filter, season_filter, team_filter, date_from, date_to)
+        )
     except Exception as e:
         logger.error(f"League analytics query failed: {e}")
         return pd.DataFrame()
 
 
-@st.cache_data(ttl=3600)
+@tracked_cache_data(ttl=3600)
 def get_team_statistics(home_team: str, away_team: str, season: str = None) -> Dict[str, Dict]:
     """
     Get team statistics for comparison between home and away teams for the specified season.
@@ -1105,38 +1527,9 @@ def get_team_statistics(home_team: str, away_team: str, season: str = None) -> D
     """
     db = get_db_manager()
     
-    # If no season specified, get the latest season from the table
-    if season is None:
-        season_query = """
-        SELECT season FROM team_statistics 
-        ORDER BY season DESC 
-        LIMIT 1
-        """
-        try:
-            season_result = db.execute_query(season_query)
-            if not season_result.empty:
-                season = season_result.iloc[0]['season']
-            else:
-                season = "2024-25"  # Fallback if no data found
-        except Exception as e:
-            logger.error(f"Failed to get latest season: {e}")
-            season = "2024-25"  # Fallback
-    
-    # Simple query to get team statistics from team_statistics table
-    stats_query = """
-    SELECT 
-        team,
-        league_rank,
-        total_points,
-        total_goals_scored,
-        total_goals_conceded,
-        last_5_games
-    FROM team_statistics 
-    WHERE team IN (%s, %s) AND season = %s
-    """
-    
     try:
-        result = db.execute_query(stats_query, (home_team, away_team, season))
+        # Latest-season lookup and stats fetch share one round trip
+        result = db.execute_prepared('team_statistics', (season, [home_team, away_team]))
         
         # Convert to dictionary format
         stats_dict = {}
@@ -1183,7 +1576,7 @@ def get_team_statistics(home_team: str, away_team: str, season: str = None) -> D
         }
 
 
-@st.cache_data(ttl=300)
+@tracked_cache_data(ttl=300)
 def get_league_table(league_filter: List[str] = None, season_filter: List[str] = None, team_filter: List[str] = None) -> pd.DataFrame:
     """
     Get league table/standings with filtering options.
@@ -1196,100 +1589,63 @@ def get_league_table(league_filter: List[str] = None, season_filter: List[str] =
     Returns:
         DataFrame with league table data
     """
-    # Base query to get league table data
-    query = """
-    SELECT 
-        team,
-        league,
-        season,
-        league_rank,
-        total_points,
-        total_games_played,
-        total_goals_scored,
-        total_goals_conceded,
-        (total_goals_scored - total_goals_conceded) AS goal_difference,
-        last_5_games,
-        CASE 
-            WHEN total_games_played > 0 
-            THEN ROUND(CAST(total_points AS NUMERIC) / total_games_played, 2)
-            ELSE 0 
-        END AS points_per_game
-    FROM team_statistics 
-    WHERE 1=1
-    """
-    
-    params = []
-    
-    # Apply league filter
-    if league_filter:
-        placeholders = ','.join(['%s'] * len(league_filter))
-        query += f" AND league IN ({placeholders})"
-        params.extend(league_filter)
-    
-    # Apply season filter
-    if season_filter:
-        placeholders = ','.join(['%s'] * len(season_filter))
-        query += f" AND season IN ({placeholders})"
-        params.extend(season_filter)
-    
-    # Apply team filter
-    if team_filter:
-        placeholders = ','.join(['%s'] * len(team_filter))
-        query += f" AND team IN ({placeholders})"
-        params.extend(team_filter)
-    
-    # Order by league, season, and rank
-    query += " ORDER BY league, season, league_rank"
-    
     db = get_db_manager()
+    params = (
+        _as_filter_array(league_filter),
+        _as_filter_array(season_filter),
+        _as_filter_array(team_filter)
+    )
     
     try:
-        if params:
-            result = db.execute_query(query, tuple(params))
-        else:
-            result = db.execute_query(query)
-        
-        return result
-        
+        table = db.execute_query_arrow(*_pyformat_query('league_table', params))
+        if table is not None:
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+        # Same Arrow-backed dtypes as the connectorx path, whichever one served the query
+        return db.execute_prepared('league_table', params).convert_dtypes(dtype_backend='pyarrow')
     except Exception as e:
         logger.error(f"League table query failed: {e}")
         return pd.DataFrame()
 
 
-@st.cache_data(ttl=300) 
-def get_league_table_leagues() -> List[str]:
-    """Get distinct leagues for league table filters."""
+@tracked_cache_data(ttl=300)
+def get_league_table_filter_options() -> Dict[str, List[str]]:
+    """
+    Get distinct leagues, seasons and teams for the league table filters in one round trip.
+    
+    Returns:
+        Dict with 'leagues', 'seasons' and 'teams' lists
+    """
     db = get_db_manager()
-    query = 'SELECT DISTINCT league FROM team_statistics WHERE league IS NOT NULL ORDER BY league'
+    query = """
+    SELECT jsonb_build_object(
+        'leagues', (SELECT jsonb_agg(DISTINCT league ORDER BY league) FROM team_statistics WHERE league IS NOT NULL),
+        'seasons', (SELECT jsonb_agg(DISTINCT season ORDER BY season DESC) FROM team_statistics WHERE season IS NOT NULL),
+        'teams', (SELECT jsonb_agg(DISTINCT team ORDER BY team) FROM team_statistics WHERE team IS NOT NULL)
+    ) AS opts
+    """
+    empty = {'leagues': [], 'seasons': [], 'teams': []}
     try:
-        result = db.execute_query(query)
-        return result['league'].tolist()
+        rows = db.execute_list(query)
+        if not rows:
+            return empty
+        opts = rows[0]
+        # jsonb_agg yields NULL for an empty table
+        return {key: opts.get(key) or [] for key in empty}
     except Exception as e:
-        logger.error(f"Failed to get league table leagues: {e}")
-        return []
+        logger.error(f"Failed to get league table filter options: {e}")
+        return empty
+
+
+def get_league_table_leagues() -> List[str]:
+    """Get distinct leagues for league table filters."""
+    return get_league_table_filter_options()['leagues']
 
 
-@st.cache_data(ttl=300)
 def get_league_table_seasons() -> List[str]:
-    """Get distinct seasons for league table filters.""" 
-    db = get_db_manager()
-    query = 'SELECT DISTINCT season FROM team_statistics WHERE season IS NOT NULL ORDER BY season DESC'
-    try:
-        result = db.execute_query(query)
-        return result['season'].tolist()
-    except Exception as e:
-        logger.error(f"Failed to get league table seasons: {e}")
-        return []
+    """Get distinct seasons for league table filters."""
+    return get_league_table_filter_options()['seasons']
 
 
-@st.cache_data(ttl=300)
 def get_league_table_teams() -> List[str]:
     """Get distinct teams for league table filters."""
-    db = get_db_manager()
-    query = 'SELECT DISTINCT team FROM team_statistics WHERE team IS NOT NULL ORDER BY team'
-    try:
-        result = db.execute_query(query) 
-        return result['team'].tolist()
-    except Exception as e:
-        logger.error(f"Failed to get league table teams: {e}")
-        return []
\ No newline at end of file
+    return get_league_table_filter_options()['teams']
\ No newline at end of file
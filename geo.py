@@ -7,12 +7,21 @@ Handles map creation, team/match visualization, and interactive geospatial compo
 import pandas as pd
 import numpy as np
 import streamlit as st
-import plotly.express as px
 import plotly.graph_objects as go
+from plotly.colors import qualitative, sequential, hex_to_rgb
 from plotly.subplots import make_subplots
 import pydeck as pdk
-from typing import Optional, Dict, List, Tuple, Any
+from typing import Optional, Dict, List, Tuple, Any, Iterable
+import hashlib
 import logging
+import re
+
+# Optional: Arrow-backed strings make hover concatenation a vectorized kernel
+try:
+    import pyarrow  # noqa: F401
+    TEXT_DTYPE = 'string[pyarrow]'
+except ImportError:
+    TEXT_DTYPE = 'string'
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -43,10 +52,93 @@ PREDICTION_COLORS = {
     'A': '#4ECDC4',   # Teal for away win prediction
 }
 
+# Map style mapping for PyDeck
+_PYDECK_STYLES = {
+    'dark': 'mapbox://styles/mapbox/dark-v10',
+    'light': 'mapbox://styles/mapbox/light-v10'
+}
+
+_PREDICTION_LEGEND_HTML = f"""
+    <div style='padding: 10px; background-color: rgba(0,0,0,0.1); border-radius: 5px; margin: 10px 0;'>
+        <h4>Prediction Legend:</h4>
+        <p><span style='color: {PREDICTION_COLORS['H']}; font-weight: bold;'>●</span> H - Home Win</p>
+        <p><span style='color: {PREDICTION_COLORS['D']}; font-weight: bold;'>●</span> D - Draw</p>
+        <p><span style='color: {PREDICTION_COLORS['A']}; font-weight: bold;'>●</span> A - Away Win</p>
+    </div>
+    """
+
+# Zoom level by coordinate spread in degrees: a spread above _ZOOM_THRESH[i - 1] and up to
+# _ZOOM_THRESH[i] maps to _ZOOM_LEVELS[i] (searchsorted, side='left')
+_ZOOM_THRESH = np.array([0.5, 1, 2, 4, 8, 15, 30])
+_ZOOM_LEVELS = np.array([10, 9, 8, 7, 6, 5, 4, 3])
+
+# Above this many points the matches map is drawn with deck.gl instead of Plotly
+PYDECK_POINT_THRESHOLD = 2000
+
+# Hover card for match markers; fields come from the customdata built in create_matches_map
+MATCH_HOVERTEMPLATE = (
+    '<b style="font-size:20px; text-align:center; display:block;">%{customdata[0]} vs %{customdata[1]}</b><br>'
+    '<span style="font-size:14px; color:#FF6B6B; text-align:center; display:block;">──────────────────────</span><br>'
+    '<span style="font-size:16px; line-height:2.0;">'
+    '📅 %{customdata[2]}<br>'
+    '🕒 %{customdata[3]}<br>'
+    '🏟️ %{customdata[4]}<br>'
+    '🏙️ %{customdata[5]}<br>'
+    '🏆 %{customdata[6]}<br>'
+    '🎯 %{customdata[7]}<br>'
+    '💰 %{customdata[8]}<br>'
+    '📊 %{customdata[9]:.3f}'
+    '</span><extra></extra>'
+)
+
+# =============================================================================
+# FIGURE CACHING
+# =============================================================================
+
+def _hash_frame(df: pd.DataFrame) -> Tuple[int, Tuple[str, ...], str]:
+    """Content hash so cached builders can key on their input frame (row order and index included)."""
+    row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return len(df), tuple(df.columns), hashlib.sha1(row_hashes.tobytes()).hexdigest()
+
+# Figure builders and frame helpers are pure functions of (frame, options); reruns with
+# unchanged inputs get the cached result instead of rebuilding every trace or group.
+cache_on_frame = st.cache_data(ttl=300, hash_funcs={pd.DataFrame: _hash_frame})
+
+def _text_columns(df: pd.DataFrame, columns: Iterable[str]) -> Dict[str, pd.Series]:
+    """Return the given columns as string-dtype Series, leaving the caller's frame untouched."""
+    return {col: df[col].astype(TEXT_DTYPE) for col in columns if col in df.columns}
+
+def _category_colors(values: pd.Series, color_map: Dict[str, str]) -> np.ndarray:
+    """Hex color per row: color_map for known labels, the Plotly palette for the rest."""
+    codes, labels = pd.factorize(values.fillna('Unknown'))
+    palette = np.array([
+        color_map.get(label, qualitative.Plotly[i % len(qualitative.Plotly)])
+        for i, label in enumerate(labels)
+    ], dtype=object)
+    return palette[codes]
+
+def _point_rgba(values: pd.Series, color_map: Dict[str, str], alpha: int = 160) -> np.ndarray:
+    """
+    RGBA color per row for deck.gl, matching the Plotly matches map: categories use
+    _category_colors, numeric columns are interpolated along the Plasma scale.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        scale = np.array([hex_to_rgb(c) for c in sequential.Plasma], dtype=float)
+        v = values.to_numpy(dtype=float, na_value=np.nan)
+        span = np.nanmax(v) - np.nanmin(v) if np.isfinite(v).any() else 0
+        t = np.nan_to_num((v - np.nanmin(v)) / span if span else np.zeros_like(v))
+        steps = np.linspace(0, 1, len(scale))
+        rgb = np.column_stack([np.interp(t, steps, scale[:, channel]) for channel in range(3)])
+    else:
+        codes, hex_colors = pd.factorize(_category_colors(values, color_map))
+        rgb = np.array([hex_to_rgb(c) for c in hex_colors], dtype=float)[codes]
+    return np.column_stack([rgb.round(), np.full(len(rgb), alpha)]).astype(np.uint8)
+
 # =============================================================================
 # CORE MAPPING FUNCTIONS
 # =============================================================================
 
+@cache_on_frame
 def create_teams_map(
     teams_df: pd.DataFrame,
     selected_team: Optional[str] = None,
@@ -68,50 +160,56 @@ def create_teams_map(
     if teams_df.empty:
         return go.Figure()
     
-    # Create a copy to avoid modifying original data
-    df = teams_df.copy()
-    
-    # Add color and size based on selection
-    df['color'] = TEAM_COLORS['neutral']
-    df['size'] = 8
+    # float32 is ample precision for web-map coordinates and halves the serialized payload
+    lat = teams_df['latitude'].to_numpy(dtype=np.float32, na_value=np.nan)
+    lon = teams_df['longitude'].to_numpy(dtype=np.float32, na_value=np.nan)
     
+    # Color and size based on selection, as arrays rather than new columns on a copy
     if selected_team:
-        df.loc[df['Team'] == selected_team, 'color'] = TEAM_COLORS['selected']
-        df.loc[df['Team'] == selected_team, 'size'] = 15
+        is_selected = (teams_df['Team'] == selected_team).to_numpy()
+    else:
+        is_selected = np.zeros(len(teams_df), dtype=bool)
+    colors = np.where(is_selected, TEAM_COLORS['selected'], TEAM_COLORS['neutral'])
+    sizes = np.where(is_selected, 15, 8)
     
     # Create hover text
-    df['hover_text'] = (
-        '<b>' + df['Team'] + '</b><br>' +
-        'Stadium: ' + df['Stadium'].fillna('Unknown') + '<br>' +
-        'City: ' + df['City'].fillna('Unknown') + '<br>' +
-        'Coordinates: (' + df['latitude'].round(3).astype(str) + 
-        ', ' + df['longitude'].round(3).astype(str) + ')'
+    text = _text_columns(teams_df, ('Team', 'Stadium', 'City'))
+    coordinates = pd.Series(
+        [f'Coordinates: ({la:.3f}, {lo:.3f})'
+         for la, lo in zip(lat, lon)],
+        index=teams_df.index,
+        dtype=TEXT_DTYPE
+    )
+    hover_text = (
+        '<b>' + text['Team'] + '</b><br>' +
+        'Stadium: ' + text['Stadium'].fillna('Unknown') + '<br>' +
+        'City: ' + text['City'].fillna('Unknown') + '<br>' +
+        coordinates
     )
     
     # Create the map
-    fig = px.scatter_mapbox(
-        df,
-        lat='latitude',
-        lon='longitude',
-        hover_name='Team',
-        hover_data={
-            'Stadium': True,
-            'City': True,
-            'latitude': ':.3f',
-            'longitude': ':.3f'
-        },
-        color='color',
-        size='size',
-        color_discrete_map='identity',
-        zoom=5,
-        height=height,
-        title='Football Teams Locations'
-    )
+    fig = go.Figure(go.Scattermapbox(
+        lat=lat,
+        lon=lon,
+        mode='markers',
+        marker=dict(size=sizes, color=colors),
+        hovertext=hover_text.to_numpy(dtype=object, na_value=''),
+        hoverinfo='text'
+    ))
     
     # Update map style and layout
     fig.update_layout(
-        mapbox_style=map_style,
-        mapbox_accesstoken=None,  # Using open street map
+        mapbox=dict(
+            style=map_style,
+            accesstoken=None,  # Using open street map
+            center=dict(
+                lat=float(np.nanmean(lat)),
+                lon=float(np.nanmean(lon))
+            ),
+            zoom=5
+        ),
+        height=height,
+        title='Football Teams Locations',
         margin={"r": 0, "t": 50, "l": 0, "b": 0},
         showlegend=False,
         font=dict(color='white' if map_style == 'dark' else 'black'),
@@ -120,12 +218,13 @@ def create_teams_map(
     
     return fig
 
+@cache_on_frame
 def create_matches_map(
     matches_df: pd.DataFrame,
     color_by: str = 'Prediction',
     map_style: str = 'dark',
     height: int = 600
-) -> go.Figure:
+) -> Optional[go.Figure]:
     """
     Create an interactive map showing matches with predictions.
     
@@ -136,62 +235,82 @@ def create_matches_map(
         height: Map height in pixels
         
     Returns:
-        plotly.graph_objects.Figure: Interactive matches map
+        plotly.graph_objects.Figure: Interactive matches map, or None when no
+        match has valid coordinates (the caller decides how to report that)
     """
     if matches_df.empty:
         return go.Figure()
     
-    # Filter out rows without coordinates
-    df = matches_df.dropna(subset=['latitude', 'longitude']).copy()
+    # Filter out rows without coordinates (dropna already returns a new frame)
+    df = matches_df.dropna(subset=['latitude', 'longitude'])
     
     if df.empty:
-        st.warning("No matches with valid coordinates found.")
-        return go.Figure()
-    
-    # Create hover text
-    df['hover_text'] = (
-        '<b style="font-size:20px; text-align:center; display:block;">' + df['Home Team'] + ' vs ' + df['Away Team'] + '</b><br>' +
-        '<span style="font-size:14px; color:#FF6B6B; text-align:center; display:block;">──────────────────────</span><br>' +
-        '<span style="font-size:16px; line-height:2.0;">' +
-        '📅 ' + pd.to_datetime(df['Game Date']).dt.strftime('%Y-%m-%d') + '<br>' +
-        '🕒 ' + df['Game Time'].astype(str) + '<br>' +
-        '🏟️ ' + df['Game Stadium'].fillna('Unknown') + '<br>' +
-        '🏙️ ' + df['City Stadium'].fillna('Unknown') + '<br>' +
-        '🏆 ' + df['National League'].fillna('Unknown') + '<br>' +
-        '🎯 ' + df['Prediction'].fillna('Unknown') + '<br>' +
-        '💰 ' + df['Predicted Odds'].astype(str) + '<br>' +
-        '📊 ' + pd.to_numeric(df['Confidence Score'], errors='coerce').fillna(0).round(3).astype(str) +
-        '</span>'
-    )
+        return None
+    
+    # Parse the confidence score once; it drives both the hover card and the marker size
+    conf = pd.to_numeric(df['Confidence Score'], errors='coerce')
+    game_dates = df['Game Date']
+    if not pd.api.types.is_datetime64_any_dtype(game_dates):
+        game_dates = pd.to_datetime(game_dates, cache=True, errors='coerce')
+    game_dates = game_dates.dt.strftime('%Y-%m-%d')
+    
+    # Raw per-match fields; Plotly.js formats them through MATCH_HOVERTEMPLATE on hover
+    customdata = np.column_stack([
+        df['Home Team'].to_numpy(),
+        df['Away Team'].to_numpy(),
+        game_dates.to_numpy(),
+        df['Game Time'].astype(str).to_numpy(),
+        df['Game Stadium'].fillna('Unknown').to_numpy(),
+        df['City Stadium'].fillna('Unknown').to_numpy(),
+        df['National League'].fillna('Unknown').to_numpy(),
+        df['Prediction'].fillna('Unknown').to_numpy(),
+        df['Predicted Odds'].astype(str).to_numpy(),
+        conf.fillna(0).to_numpy()
+    ])
     
     # Set up color mapping
-    color_discrete_map = None
+    color_discrete_map = {}
     if color_by == 'Prediction':
         color_discrete_map = PREDICTION_COLORS
     
-    # Ensure confidence score is numeric for sizing
-    df['confidence_numeric'] = pd.to_numeric(df['Confidence Score'], errors='coerce').fillna(0.5)
+    # Confidence score maps straight to a 4-15px marker diameter
+    lat = df['latitude'].to_numpy(dtype=np.float32)
+    lon = df['longitude'].to_numpy(dtype=np.float32)
+    sizes = np.clip(conf.fillna(0.5).to_numpy(dtype=np.float32) * 15, 4, 15)
+    
+    # One trace with a per-point color array; the legend lives in create_legend_for_predictions
+    colors = df[color_by]
+    if pd.api.types.is_numeric_dtype(colors):
+        marker = dict(
+            size=sizes, sizemode='diameter',
+            color=colors.to_numpy(), colorscale='Plasma', showscale=True,
+            colorbar=dict(title=color_by)
+        )
+    else:
+        marker = dict(size=sizes, sizemode='diameter', color=_category_colors(colors, color_discrete_map))
     
     # Create the map
-    fig = px.scatter_mapbox(
-        df,
-        lat='latitude',
-        lon='longitude',
-        color=color_by,
-        size='confidence_numeric',
-        hover_name='hover_text',
-        color_discrete_map=color_discrete_map,
-        size_max=15,
-        zoom=5,
-        height=height,
-        title=f'Football Matches - Colored by {color_by}'
-    )
+    fig = go.Figure(go.Scattermapbox(
+        lat=lat,
+        lon=lon,
+        mode='markers',
+        marker=marker,
+        customdata=customdata,
+        hovertemplate=MATCH_HOVERTEMPLATE
+    ))
     
     # Update layout
     fig.update_layout(
-        mapbox_style=map_style,
-        mapbox_accesstoken=None,
+        mapbox=dict(
+            style=map_style,
+            accesstoken=None,
+            center=dict(lat=float(lat.mean()), lon=float(lon.mean())),
+            zoom=5
+        ),
+        height=height,
+        title=f'Football Matches - Colored by {color_by}',
         margin={"r": 0, "t": 50, "l": 0, "b": 0},
+        showlegend=False,
         font=dict(color='white' if map_style == 'dark' else 'black'),
         paper_bgcolor='rgba(0,0,0,0)' if map_style == 'dark' else 'white'
     )
@@ -201,7 +320,10 @@ def create_matches_map(
 def create_pydeck_map(
     data: pd.DataFrame,
     view_state: Optional[Dict] = None,
-    map_style: str = 'dark'
+    map_style: str = 'dark',
+    tooltip: Optional[Dict] = None,
+    colors: Optional[np.ndarray] = None,
+    radii: Optional[np.ndarray] = None
 ) -> pdk.Deck:
     """
     Create a PyDeck map for more advanced visualizations.
@@ -210,6 +332,9 @@ def create_pydeck_map(
         data: DataFrame with lat/lon and other attributes
         view_state: Optional view state configuration
         map_style: Map style
+        tooltip: Optional PyDeck tooltip spec (defaults to the team stadium tooltip)
+        colors: Optional (n, 4) RGBA array, one row per point (defaults to translucent red)
+        radii: Optional per-point radius in pixels (defaults to a fixed 10 km radius)
         
     Returns:
         pdk.Deck: PyDeck map object
@@ -227,41 +352,115 @@ def create_pydeck_map(
             'bearing': 0
         }
     
+    if tooltip is None:
+        tooltip = {
+            "html": "<b>{Team}</b><br/>Stadium: {Stadium}<br/>City: {City}",
+            "style": {"backgroundColor": "steelblue", "color": "white"}
+        }
+    
+    # Ship a precomputed [lon, lat] position per point plus only the fields the tooltip
+    # shows, so deck.gl reads the position directly instead of evaluating an accessor
+    positions = np.column_stack([
+        data['longitude'].to_numpy(dtype=float),
+        data['latitude'].to_numpy(dtype=float)
+    ]).round(5)
+    fields = [f for f in dict.fromkeys(re.findall(r'{([^{}]+)}', tooltip.get('html') or tooltip.get('text', ''))) if f in data.columns]
+    layer_data = pd.DataFrame({'position': positions.tolist()})
+    for field in fields:
+        layer_data[field] = data[field].to_numpy()
+    
+    style = {
+        'get_fill_color': '[255, 107, 107, 160]',  # Red with transparency
+        'get_radius': 10000
+    }
+    if colors is not None:
+        layer_data['color'] = colors.tolist()
+        style['get_fill_color'] = 'color'
+    if radii is not None:
+        layer_data['radius'] = np.asarray(radii, dtype=float).round(1)
+        style.update(get_radius='radius', radius_units='pixels')
+    
     # Create scatter plot layer
     scatter_layer = pdk.Layer(
         'ScatterplotLayer',
-        data=data,
-        get_position='[longitude, latitude]',
-        get_color='[255, 107, 107, 160]',  # Red with transparency
-        get_radius=10000,
+        data=layer_data,
+        get_position='position',
         radius_scale=1,
         pickable=True,
-        auto_highlight=True
+        auto_highlight=True,
+        **style
     )
     
-    # Map style mapping for PyDeck
-    pydeck_styles = {
-        'dark': 'mapbox://styles/mapbox/dark-v10',
-        'light': 'mapbox://styles/mapbox/light-v10'
-    }
-    
     # Create the deck
     deck = pdk.Deck(
         layers=[scatter_layer],
         initial_view_state=view_state,
-        map_style=pydeck_styles.get(map_style, 'mapbox://styles/mapbox/dark-v10'),
-        tooltip={
-            "html": "<b>{Team}</b><br/>Stadium: {Stadium}<br/>City: {City}",
-            "style": {"backgroundColor": "steelblue", "color": "white"}
-        }
+        map_style=_PYDECK_STYLES.get(map_style, _PYDECK_STYLES['dark']),
+        tooltip=tooltip
     )
     
     return deck
 
+def display_matches_map(
+    matches_df: pd.DataFrame,
+    color_by: str = 'Prediction',
+    map_style: str = 'dark',
+    height: int = 600
+) -> None:
+    """
+    Render the matches map, switching to deck.gl once there are too many points for Plotly.
+    
+    Args:
+        matches_df: DataFrame with match data including coordinates
+        color_by: Column to color points by ('Prediction', 'Model', 'National League')
+        map_style: Map style
+        height: Map height in pixels (Plotly map only)
+    """
+    # Only located matches are drawn, so they alone decide which renderer is needed
+    points = matches_df.dropna(subset=['latitude', 'longitude'])
+    if len(points) > PYDECK_POINT_THRESHOLD:
+        lat_center, lon_center = calculate_map_center(points)
+        # Same colors and confidence-based 4-15px diameters as the Plotly map
+        conf = pd.to_numeric(points['Confidence Score'], errors='coerce')
+        deck = create_pydeck_map(
+            points[['latitude', 'longitude', 'Home Team', 'Away Team', 'Prediction']],
+            view_state={
+                'latitude': lat_center,
+                'longitude': lon_center,
+                'zoom': get_optimal_zoom_level(points),
+                'pitch': 0,
+                'bearing': 0
+            },
+            map_style=map_style,
+            tooltip={
+                "html": "<b>{Home Team} vs {Away Team}</b><br/>Prediction: {Prediction}",
+                "style": {"backgroundColor": "steelblue", "color": "white"}
+            },
+            colors=_point_rgba(points[color_by], PREDICTION_COLORS if color_by == 'Prediction' else {}),
+            radii=np.clip(conf.fillna(0.5).to_numpy(dtype=float) * 15, 4, 15) / 2
+        )
+        st.pydeck_chart(deck, use_container_width=True)
+        return
+    
+    fig = create_matches_map(matches_df, color_by=color_by, map_style=map_style, height=height)
+    if fig is None:
+        st.warning("No matches with valid coordinates found.")
+        return
+    st.plotly_chart(fig, use_container_width=True)
+
 # =============================================================================
 # SPECIALIZED VISUALIZATION FUNCTIONS
 # =============================================================================
 
+@cache_on_frame
+def _split_by_prediction(matches_df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Matches with valid coordinates, grouped by prediction type in a single pass."""
+    lat = matches_df['latitude'].to_numpy(dtype=float, na_value=np.nan)
+    lon = matches_df['longitude'].to_numpy(dtype=float, na_value=np.nan)
+    located = matches_df.iloc[~np.isnan(lat) & ~np.isnan(lon)]
+    return {prediction: group for prediction, group in located.groupby('Prediction', sort=False)}
+
+@cache_on_frame
 def create_prediction_density_map(
     matches_df: pd.DataFrame,
     prediction_type: str = 'H',
@@ -281,35 +480,34 @@ def create_prediction_density_map(
     if matches_df.empty:
         return go.Figure()
     
-    # Filter for specific prediction type and valid coordinates
-    df = matches_df[
-        (matches_df['Prediction'] == prediction_type) &
-        matches_df['latitude'].notna() &
-        matches_df['longitude'].notna()
-    ].copy()
+    # Located matches are split once per frame and shared by the H/D/A heatmaps
+    df = _split_by_prediction(matches_df).get(prediction_type)
     
-    if df.empty:
+    if df is None or df.empty:
         return go.Figure()
     
-    fig = px.density_mapbox(
-        df,
-        lat='latitude',
-        lon='longitude',
-        z='Confidence Score',
-        radius=20,
-        center=dict(lat=50.0, lon=10.0),
-        zoom=4,
-        mapbox_style=map_style,
-        title=f'Density of {prediction_type} Predictions by Confidence'
-    )
+    # Single WebGL density trace with a numeric weight array
+    fig = go.Figure(go.Densitymapbox(
+        lat=df['latitude'].to_numpy(),
+        lon=df['longitude'].to_numpy(),
+        z=pd.to_numeric(df['Confidence Score'], errors='coerce').fillna(0).to_numpy(),
+        radius=20
+    ))
     
     fig.update_layout(
+        mapbox=dict(
+            style=map_style,
+            center=dict(lat=50.0, lon=10.0),
+            zoom=4
+        ),
+        title=f'Density of {prediction_type} Predictions by Confidence',
         margin={"r": 0, "t": 50, "l": 0, "b": 0},
         font=dict(color='white' if map_style == 'dark' else 'black')
     )
     
     return fig
 
+@cache_on_frame
 def create_team_route_map(
     team_matches: pd.DataFrame,
     team_name: str,
@@ -319,7 +517,8 @@ def create_team_route_map(
     Create a map showing a team's matches with connecting lines (journey map).
     
     Args:
-        team_matches: DataFrame with team's matches and coordinates
+        team_matches: DataFrame with team's matches and coordinates; ideally already ordered
+            by Game Date (e.g. filter_matches_by_team on sort_matches_by_date output)
         team_name: Name of the team
         map_style: Map style
         
@@ -329,23 +528,36 @@ def create_team_route_map(
     if team_matches.empty:
         return go.Figure()
     
-    # Sort by date to show journey progression
-    df = team_matches.sort_values('Game Date').copy()
+    # Date-ordered input (the sort_matches_by_date path) is used as is; anything else is
+    # sorted here so the journey order never depends on what the caller passed
+    df = team_matches
+    if not df['Game Date'].is_monotonic_increasing:
+        df = df.sort_values('Game Date', kind='stable')
+    
+    # Opponent and marker color depend only on whether the team played at home
+    home = df['Home Team'].to_numpy()
+    away = df['Away Team'].to_numpy()
+    is_home = home == team_name
+    opponents = np.where(is_home, away, home)
+    marker_colors = np.where(is_home, TEAM_COLORS['home'], TEAM_COLORS['away'])
+    
+    # Coordinates are shared by both traces and the map center; extract them once
+    lat = df['latitude'].to_numpy(dtype=float)
+    lon = df['longitude'].to_numpy(dtype=float)
     
     # Create the base map
     fig = go.Figure()
     
     # Add match points
     fig.add_trace(go.Scattermapbox(
-        lat=df['latitude'],
-        lon=df['longitude'],
+        lat=lat,
+        lon=lon,
         mode='markers+text',
         marker=dict(
             size=12,
-            color=[TEAM_COLORS['home'] if ht == team_name else TEAM_COLORS['away'] 
-                   for ht in df['Home Team']]
+            color=marker_colors
         ),
-        text=df.index + 1,  # Match number
+        text=np.arange(1, len(df) + 1),  # Match number
         textposition="middle center",
         hovertemplate=(
             '<b>Match %{text}</b><br>' +
@@ -355,21 +567,20 @@ def create_team_route_map(
             'Prediction: %{customdata[3]}<br>' +
             '<extra></extra>'
         ),
-        customdata=list(zip(
-            df['Game Date'],
-            [f"{row['Away Team']}" if row['Home Team'] == team_name else f"{row['Home Team']}"
-             for _, row in df.iterrows()],
-            df['Game Stadium'].fillna('Unknown'),
-            df['Prediction']
-        )),
+        customdata=np.column_stack([
+            df['Game Date'].to_numpy(dtype=object),  # Timestamps, not datetime64 ints
+            opponents,
+            df['Game Stadium'].fillna('Unknown').to_numpy(),
+            df['Prediction'].to_numpy()
+        ]),
         name='Matches'
     ))
     
     # Add connecting lines to show journey
     if len(df) > 1:
         fig.add_trace(go.Scattermapbox(
-            lat=df['latitude'],
-            lon=df['longitude'],
+            lat=lat,
+            lon=lon,
             mode='lines',
             line=dict(width=2, color='rgba(255, 255, 255, 0.5)'),
             hoverinfo='skip',
@@ -381,8 +592,8 @@ def create_team_route_map(
         mapbox=dict(
             style=map_style,
             center=dict(
-                lat=df['latitude'].mean(),
-                lon=df['longitude'].mean()
+                lat=float(np.nanmean(lat)),
+                lon=float(np.nanmean(lon))
             ),
             zoom=6
         ),
@@ -443,29 +654,50 @@ def get_optimal_zoom_level(df: pd.DataFrame) -> int:
     if len(valid_coords) < 2:
         return 8
     
-    # Calculate the bounding box
-    lat_range = valid_coords['latitude'].max() - valid_coords['latitude'].min()
-    lon_range = valid_coords['longitude'].max() - valid_coords['longitude'].min()
+    # Calculate the bounding box in one min/max pass over both columns
+    coords = valid_coords[['latitude', 'longitude']].to_numpy(dtype=float)
+    ranges = coords.max(axis=0) - coords.min(axis=0)
     
     # Determine zoom level based on coordinate spread
-    max_range = max(lat_range, lon_range)
+    max_range = ranges.max()
     
-    if max_range > 30:
-        return 3
-    elif max_range > 15:
-        return 4
-    elif max_range > 8:
-        return 5
-    elif max_range > 4:
-        return 6
-    elif max_range > 2:
-        return 7
-    elif max_range > 1:
-        return 8
-    elif max_range > 0.5:
-        return 9
-    else:
-        return 10
+    return int(_ZOOM_LEVELS[np.searchsorted(_ZOOM_THRESH, max_range)])
+
+@cache_on_frame
+def sort_matches_by_date(matches_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Order matches by Game Date once so per-team views (route maps) need no sort of their own.
+    
+    Args:
+        matches_df: DataFrame with match data
+        
+    Returns:
+        pd.DataFrame: Matches in stable Game Date order with a fresh RangeIndex
+    """
+    if matches_df.empty:
+        return matches_df
+    return matches_df.sort_values('Game Date', kind='stable').reset_index(drop=True)
+
+@cache_on_frame
+def _build_team_index(matches_df: pd.DataFrame) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Map each team to the row positions of its home, away and all matches.
+    Built once per frame so per-team filtering is a lookup instead of a column scan.
+    Takes only the team columns: the positions depend on nothing else, and hashing two
+    columns for the cache key is cheaper than the scans the index replaces. _hash_frame
+    keys on row order, so a re-sorted frame gets its own index.
+    """
+    home = matches_df.groupby('Home Team', sort=False).indices
+    away = matches_df.groupby('Away Team', sort=False).indices
+    empty = np.empty(0, dtype=np.intp)
+    return {
+        'home': home,
+        'away': away,
+        'all': {
+            team: np.union1d(home.get(team, empty), away.get(team, empty))
+            for team in home.keys() | away.keys()
+        }
+    }
 
 def filter_matches_by_team(
     matches_df: pd.DataFrame,
@@ -486,15 +718,13 @@ def filter_matches_by_team(
     if matches_df.empty:
         return matches_df
     
-    if match_type == 'home':
-        return matches_df[matches_df['Home Team'] == team_name]
-    elif match_type == 'away':
-        return matches_df[matches_df['Away Team'] == team_name]
-    else:  # 'all'
-        return matches_df[
-            (matches_df['Home Team'] == team_name) | 
-            (matches_df['Away Team'] == team_name)
-        ]
+    if match_type not in ('home', 'away'):
+        match_type = 'all'
+    
+    positions = _build_team_index(matches_df[['Home Team', 'Away Team']])[match_type].get(team_name)
+    if positions is None:
+        return matches_df.iloc[0:0]
+    return matches_df.iloc[positions]
 
 def add_map_controls(map_container):
     """
@@ -527,15 +757,7 @@ def add_map_controls(map_container):
 
 def create_legend_for_predictions():
     """Create a legend explaining prediction colors."""
-    legend_html = """
-    <div style='padding: 10px; background-color: rgba(0,0,0,0.1); border-radius: 5px; margin: 10px 0;'>
-        <h4>Prediction Legend:</h4>
-        <p><span style='color: #FF6B6B; font-weight: bold;'>●</span> H - Home Win</p>
-        <p><span style='color: #FFA726; font-weight: bold;'>●</span> D - Draw</p>
-        <p><span style='color: #4ECDC4; font-weight: bold;'>●</span> A - Away Win</p>
-    </div>
-    """
-    return legend_html
+    return _PREDICTION_LEGEND_HTML
 
 # =============================================================================
 # MAP STATS AND ANALYTICS
@@ -559,17 +781,24 @@ def calculate_geographic_stats(df: pd.DataFrame) -> Dict[str, Any]:
     if valid_coords.empty:
         return {}
     
+    # One min, max and mean pass over the (lat, lon) block instead of one per statistic
+    coords_df = valid_coords[['latitude', 'longitude']]
+    coords = coords_df.to_numpy(dtype=float)
+    lat_min, lon_min = coords.min(axis=0)
+    lat_max, lon_max = coords.max(axis=0)
+    lat_center, lon_center = coords.mean(axis=0)
+    
     stats = {
         'total_locations': len(valid_coords),
-        'unique_coordinates': len(valid_coords[['latitude', 'longitude']].drop_duplicates()),
-        'center_lat': float(valid_coords['latitude'].mean()),
-        'center_lon': float(valid_coords['longitude'].mean()),
-        'lat_range': float(valid_coords['latitude'].max() - valid_coords['latitude'].min()),
-        'lon_range': float(valid_coords['longitude'].max() - valid_coords['longitude'].min()),
-        'northernmost': float(valid_coords['latitude'].max()),
-        'southernmost': float(valid_coords['latitude'].min()),
-        'easternmost': float(valid_coords['longitude'].max()),
-        'westernmost': float(valid_coords['longitude'].min())
+        'unique_coordinates': len(coords_df.drop_duplicates()),
+        'center_lat': float(lat_center),
+        'center_lon': float(lon_center),
+        'lat_range': float(lat_max - lat_min),
+        'lon_range': float(lon_max - lon_min),
+        'northernmost': float(lat_max),
+        'southernmost': float(lat_min),
+        'easternmost': float(lon_max),
+        'westernmost': float(lon_min)
     }
     
     return stats
@@ -588,13 +817,13 @@ def get_country_distribution(teams_df: pd.DataFrame) -> pd.DataFrame:
     if teams_df.empty or 'country' not in teams_df.columns:
         return pd.DataFrame()
     
-    country_stats = teams_df.groupby('country').agg({
-        'Team': 'count',
-        'latitude': 'mean',
-        'longitude': 'mean'
-    }).reset_index()
+    # Unsorted, observed-only groups: the result is sorted by count below anyway
+    country_stats = teams_df.groupby('country', sort=False, observed=True).agg(
+        Team_Count=('Team', 'size'),
+        Avg_Latitude=('latitude', 'mean'),
+        Avg_Longitude=('longitude', 'mean')
+    ).reset_index().rename(columns={'country': 'Country'})
     
-    country_stats.columns = ['Country', 'Team_Count', 'Avg_Latitude', 'Avg_Longitude']
     country_stats = country_stats.sort_values('Team_Count', ascending=False)
     
     return country_stats
\ No newline at end of file
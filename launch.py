@@ -6,8 +6,23 @@ Run this script to start the Streamlit app with proper environment setup.
 
 import os
 import sys
+import compileall
+import importlib
+import importlib.util
+import threading
 from pathlib import Path
 
+REQUIRED_PACKAGES = ('streamlit', 'psycopg2', 'plotly', 'pandas')
+LOCAL_MODULES = ('app', 'db', 'geo', 'config')
+PREWARM_MODULES = ('pandas', 'plotly.graph_objects', 'pydeck')
+
+# `streamlit run launch.py` re-executes this script on every rerun, so module globals reset;
+# the environment keeps the PID of the process that already did the one-time warm-up
+WARMUP_FLAG = '_POKOPRED_WARMED_PID'
+
+# Emoji only on an interactive UTF-8 terminal; redirected logs and CI pipes get plain ASCII
+FANCY_OUTPUT = sys.stdout.isatty() and (sys.stdout.encoding or '').lower().startswith('utf')
+
 
 def detect_cloud_environment():
     """Detect if we're running in Streamlit Cloud."""
@@ -21,84 +36,140 @@ def detect_cloud_environment():
     return any(cloud_indicators)
 
 
-def main():
-    print("Football Predictions Dashboard Launcher")
-    print("=" * 50)
+def prewarm_imports():
+    """Import the app's heavy dependencies on a background thread."""
+    def import_all():
+        for name in PREWARM_MODULES:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass
+
+    thread = threading.Thread(target=import_all, name='prewarm-imports', daemon=True)
+    thread.start()
+    return thread
+
+
+def load_local_module(name):
+    """Import a module that sits next to this launcher by path, without touching sys.path."""
+    if name in sys.modules:
+        return sys.modules[name]
+    path = Path(__file__).parent / f'{name}.py'
+    if not path.is_file():
+        # Match what a plain import reports, so callers only need to handle ImportError
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name, path=str(path))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # Register before executing so app.py's plain `import db` reuses this instance
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def serve_app(app_path):
+    """Start the Streamlit server for app_path in the current process (blocks until shutdown)."""
+    from streamlit.web import bootstrap
+
+    bootstrap.load_config_options(flag_options={})
+    bootstrap.run(str(app_path), False, [], {})
+    return 0
+
+
+def say(fancy, plain):
+    """Pick the emoji or the plain ASCII form of a message for the current stdout."""
+    return fancy if FANCY_OUTPUT else plain
+
+
+def write_lines(lines):
+    """Write a block of output lines with a single write and flush."""
+    sys.stdout.write('\n'.join(lines) + '\n')
+    sys.stdout.flush()
+
 
+def main():
     is_cloud = detect_cloud_environment()
-    print(f"🌍 Running in: {'Streamlit Cloud' if is_cloud else 'Local Environment'}")
+    # The startup banner is collected and written in one go at each exit point
+    banner = [
+        "Football Predictions Dashboard Launcher",
+        "=" * 50,
+        say("🌍 ", "") + f"Running in: {'Streamlit Cloud' if is_cloud else 'Local Environment'}"
+    ]
 
     if not is_cloud:
-        print("❌ This launcher is intended for Streamlit Cloud deployments only.")
-        print("   Please use `streamlit run app.py` for local development.")
+        banner += [
+            say("❌ ", "[ERROR] ") + "This launcher is intended for Streamlit Cloud deployments only.",
+            "   Please use `streamlit run app.py` for local development."
+        ]
+        write_lines(banner)
         return 1
 
     script_dir = Path(__file__).parent
     os.chdir(script_dir)
 
-    print("☁️ Running in cloud - using Streamlit Cloud secrets")
-    print("   💡 Configure credentials in Streamlit Cloud dashboard under Settings → Secrets")
+    banner += [
+        say("☁️ ", "") + "Running in cloud - using Streamlit Cloud secrets",
+        say("   💡 Configure credentials in Streamlit Cloud dashboard under Settings → Secrets",
+            "   Configure credentials in Streamlit Cloud dashboard under Settings -> Secrets")
+    ]
 
-    try:
-        import streamlit  # noqa: F401
-        import psycopg2  # noqa: F401
-        import plotly  # noqa: F401
-        import pandas  # noqa: F401
-        from dotenv import load_dotenv  # noqa: F401
-        print("✅ All required packages are available")
-    except ImportError as err:
-        print(f"❌ Missing package: {err}")
+    # find_spec only locates the packages; app.py pays for importing them when it runs
+    missing = [name for name in REQUIRED_PACKAGES if importlib.util.find_spec(name) is None]
+    if missing:
+        banner.append(say("❌ ", "[ERROR] ") + f"Missing package: {', '.join(missing)}")
+        write_lines(banner)
         return 1
+    banner.append(say("✅ ", "[OK] ") + "All required packages are available")
+    write_lines(banner)
+
+    first_run = os.environ.get(WARMUP_FLAG) != str(os.getpid())
+    os.environ[WARMUP_FLAG] = str(os.getpid())
+
+    # Opt-in: the app reports connection problems itself on first render
+    precheck_db = os.getenv('POKOPRED_PRECHECK_DB') == '1'
+
+    # The app runs in this process, so heavy imports started now overlap the blocking DB
+    # check; without it nothing runs before app.py imports them and a thread would only wait
+    if first_run and precheck_db:
+        prewarm_imports()
+
+    if precheck_db:
+        print(say("🗄️ ", "") + "Testing database connection...")
+        try:
+            test_database_connection = load_local_module('db').test_database_connection_once
+        except ImportError as err:
+            print(say("⚠️ ", "[WARN] ") + f"Database test failed: {err} - app will start anyway")
+        else:
+            if test_database_connection():
+                print(say("✅ ", "[OK] ") + "Database connection successful")
+            else:
+                print(say("⚠️ ", "[WARN] ") + "Database connection failed - app will start anyway")
 
-    print("🗄️ Testing database connection...")
-    try:
-        sys.path.append('.')
-        from db import test_database_connection
+    # Warm __pycache__ so the first page render loads bytecode instead of parsing source
+    if first_run:
+        for module_name in LOCAL_MODULES:
+            compileall.compile_file(str(script_dir / f'{module_name}.py'), quiet=1)
 
-        if test_database_connection():
-            print("✅ Database connection successful")
-        else:
-            print("⚠️ Database connection failed - app will start anyway")
-    except Exception as err:
-        print(f"⚠️ Database test failed: {err} - app will start anyway")
+    print(say("🚀 ", "") + "Starting app for Streamlit Cloud...")
+    from streamlit import runtime
 
-    print("🚀 Starting app for Streamlit Cloud...")
-    try:
-        import streamlit as st
-        import pandas as pd
-        import numpy as np
-        import plotly.express as px
-        import plotly.graph_objects as go
-        from datetime import datetime, date, timedelta
-        import warnings
-
-        warnings.filterwarnings('ignore')
-
-        import db
-        import geo
-
-        app_globals = {
-            'st': st,
-            'pd': pd,
-            'np': np,
-            'px': px,
-            'go': go,
-            'datetime': datetime,
-            'date': date,
-            'timedelta': timedelta,
-            'warnings': warnings,
-            'db': db,
-            'geo': geo,
-            '__name__': '__main__'
-        }
-
-        with open('app.py', 'r', encoding='utf-8') as app_file:
-            app_code = app_file.read()
-        exec(app_code, app_globals)
-        return 0
-    except Exception as err:
-        print(f"❌ Failed to run app: {err}")
-        return 1
+    if not runtime.exists():
+        # Started with plain `python launch.py`: host the server in this process rather
+        # than spawning a second interpreter through the streamlit CLI
+        return serve_app(script_dir / 'app.py')
+
+    import runpy
+    import warnings
+
+    warnings.filterwarnings('ignore')
+
+    # Run app.py through the import system so its bytecode is cached in __pycache__
+    # (runpy.run_path on a source file would recompile it on every start)
+    runpy.run_module('app', run_name='__main__')
+    return 0
 
 
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ This file is optimized for Streamlit Cloud deployment.
 
 import os
 import sys
+import importlib.util
 from pathlib import Path
 
 def setup_environment():
@@ -17,16 +18,13 @@ def setup_environment():
     script_dir = Path(__file__).parent
     os.chdir(script_dir)
     
-    # Check required packages
-    try:
-        import streamlit
-        import pandas
-        import plotly
-        print("✅ All required packages are available")
-    except ImportError as e:
-        print(f"❌ Missing package: {e}")
+    # Check required packages (find_spec locates them without importing)
+    missing = [name for name in ("streamlit", "pandas", "plotly") if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"❌ Missing package: {', '.join(missing)}")
         # In cloud, packages should be installed via requirements.txt
         return False
+    print("✅ All required packages are available")
     
     # For cloud deployment, we don't test database here
     # Database credentials should be in Streamlit Cloud secrets